@@ -108,18 +108,21 @@ class Cluster:
             self._averaged_risk = self_weight * self._averaged_risk + other_weight * other_cluster.averaged_risk()
             return self
 
-    def cluster_error(self, data_table):
+    def cluster_error(self, data_table, fips_to_line=None):
         """
         Input: data_table is the original table of cancer data used in creating the cluster.
+        fips_to_line optionally maps fips codes to line indexes of data_table, pass it in
+        to skip rebuilding it for every cluster
         
         Output: The error as the sum of the square of the distance from each county
         in the cluster to the cluster center (weighted by its population)
         """
         # Build hash table to accelerate error computation
-        fips_to_line = {}
-        for line_idx in range(len(data_table)):
-            line = data_table[line_idx]
-            fips_to_line[line[0]] = line_idx
+        if fips_to_line is None:
+            fips_to_line = {}
+            for line_idx in range(len(data_table)):
+                line = data_table[line_idx]
+                fips_to_line[line[0]] = line_idx
         
         # compute error as weighted squared distance from counties to cluster center
         total_error = 0
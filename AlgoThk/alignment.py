@@ -2,6 +2,10 @@
 Module for computing global and local alignment
 of two strings
 """
+import numpy as np
+
+# global alignments of at most this many cells skip Hirschberg splitting
+_HIRSCHBERG_CELLS = 2 ** 12
 
 # %%
 def build_scoring_matrix(alph, diag_s, odiag_s, dash_s):
@@ -73,32 +77,219 @@ def compute_alignment_matrix(seq_x, seq_y, scores, global_flag):
 
     return
     ------
-    alignment matrix with shape (x+1, y+1)
+    alignment matrix with shape (x+1, y+1), an AlignmentMatrix
     """
-    len_x, len_y = len(seq_x), len(seq_y)
+    matrix = AlignmentMatrix()
+    for row_i, row in enumerate(_iter_alignment_rows(seq_x, seq_y, scores, global_flag)):
+        matrix.append(row)
+        val = max(row)
+        if val > matrix.max_cell[0]:
+            matrix.max_cell = (val, row_i, row.index(val))
+    return matrix
+
+
+class AlignmentMatrix(list):
+    """
+    Alignment matrix as a list of rows, which also keeps the max cell
+        found while filling it
+
+    max_cell: (max value, row_i, col_j), the first max cell row by row
+    """
+    max_cell = (float('-inf'), None, None)
+
+
+def _iter_alignment_rows(seq_x, seq_y, scores, global_flag):
+    """
+    Generate the rows of the alignment matrix one at a time,
+        only the previous row is kept around
+    """
+    floor = not global_flag
+    dash_y = [scores['-'][char_y] for char_y in seq_y]
+
+    row = [0]
+    for dash_s in dash_y:
+        row.append(_zero_floor(row[-1] + dash_s, floor))
+    yield row
 
-    # init matrix
-    matrix = create_matrix(len_x+1, len_y+1, 0)
-    for idx_i in range(1, len_x+1):
-        val = matrix[idx_i-1][0] + scores[seq_x[idx_i-1]]['-']
-        matrix[idx_i][0] = _zero_floor(val, not global_flag)
-    for idx_j in range(1, len_y+1):
-        val = matrix[0][idx_j-1] + scores['-'][seq_y[idx_j-1]]
-        matrix[0][idx_j] = _zero_floor(val, not global_flag)
-
-    # work way through the matrix to the bottom right corner
-    for row_i in range(1, len_x+1):
-        for col_j in range(1, len_y+1):
+    for char_x in seq_x:
+        x_scores = scores[char_x]
+        dash_x = x_scores['-']
+        prev, row = row, [_zero_floor(row[0] + dash_x, floor)]
+        for col_j, char_y in enumerate(seq_y):
             val = max(
-                matrix[row_i-1][col_j] + scores[seq_x[row_i-1]]['-'],  # top tile
-                matrix[row_i-1][col_j-1] + scores[seq_x[row_i-1]][seq_y[col_j-1]],  # upper-left tile
-                matrix[row_i][col_j-1] + scores['-'][seq_y[col_j-1]],  # left tile
+                prev[col_j+1] + dash_x,  # top tile
+                prev[col_j] + x_scores[char_y],  # upper-left tile
+                row[col_j] + dash_y[col_j],  # left tile
             )
-            matrix[row_i][col_j] = _zero_floor(val, not global_flag)
+            row.append(_zero_floor(val, floor))
+        yield row
+
+
+class QueryProfile:
+    """
+    Scores of one sequence, laid along the columns of the alignment
+        matrix, against every letter of the scoring matrix, for
+        aligning many sequences along the rows with array operations
+
+    parameter
+    ---------
+    seq_y: str, sequence along the columns
+    scores: scoring matrix from build_scoring_matrix
+    """
+
+    def __init__(self, seq_y, scores):
+        """Encode the scoring matrix and seq_y as arrays"""
+        chars = sorted(scores)
+        self._seq_y = seq_y
+        self._index = dict((char, code) for code, char in enumerate(chars))
+        self._dash = self._index['-']
+
+        # dense scores, int64 when all scores are integers
+        table = np.array([[scores[row_c][col_c] for col_c in chars] for row_c in chars])
+        self._table = table.astype(np.int64 if np.issubdtype(table.dtype, np.integer) else np.float64)
+
+        codes_y = self.encode(seq_y)
+        self._pairs = self._table[:, codes_y]  # pair scores of every letter at every position of seq_y
+        self._gaps = np.concatenate(([0], np.cumsum(self._table[self._dash, codes_y]))).astype(self._table.dtype)
 
+    def dash(self):
+        """Letter code of '-'"""
+        return self._dash
+
+    def table(self):
+        """Scoring matrix as an array indexed by letter codes"""
+        return self._table
+
+    def pairs(self):
+        """Array of the scores of every letter code at every position of seq_y"""
+        return self._pairs
+
+    def gaps(self):
+        """Prefix sums of the scores of seq_y against '-', len(seq_y) + 1 values"""
+        return self._gaps
+
+    def encode(self, seq):
+        """Letter codes of a sequence"""
+        return np.array([self._index[char] for char in seq], dtype=np.intp)
+
+    def rows(self, seq_x, global_flag):
+        """
+        Generate the rows of the alignment matrix of seq_x and seq_y as arrays
+
+        rationale
+        ---------
+        Top and upper-left tiles only depend on the previous row. The left
+            tile chain row[j] = max(cand[j], row[j-1] + gap[j]) unrolls to
+            gaps[j] + max(cand[k] - gaps[k] for k <= j), with gaps the prefix
+            sums of the gap scores along seq_y, a running max. Exact for
+            integer scores, float scores may round differently in the last bit.
+        """
+        table, dash, pairs, gaps = self._table, self._dash, self._pairs, self._gaps
+        if global_flag:
+            row = gaps
+        else:
+            row = gaps + np.maximum.accumulate(-gaps)
+        yield row
+
+        cand = np.empty_like(row)
+        for code in self.encode(seq_x):
+            dash_x = table[code, dash]
+            cand[0] = row[0] + dash_x
+            np.maximum(row[1:] + dash_x, row[:-1] + pairs[code], out=cand[1:])
+            if not global_flag:
+                np.maximum(cand, 0, out=cand)
+            row = gaps + np.maximum.accumulate(cand - gaps)
+            yield row
+
+    def score(self, seq_x, global_flag):
+        """Optimal global or local alignment score of seq_x and seq_y"""
+        if global_flag:
+            for row in self.rows(seq_x, True):
+                pass
+            return row[-1].item()
+        return max(row.max() for row in self.rows(seq_x, False)).item()
+
+
+def _iter_alignment_arrays(seq_x, seq_y, scores, global_flag):
+    """Generate the rows of the alignment matrix as arrays, see QueryProfile.rows"""
+    return QueryProfile(seq_y, scores).rows(seq_x, global_flag)
+
+
+def fast_compute_alignment_matrix(seq_x, seq_y, scores, global_flag):
+    """
+    Vectorized compute_alignment_matrix, one array operation per row
+
+    parameter
+    ---------
+    seq_x, seq_y: str, two string sequences used for computing alignment matrix
+    scores: scoring matrix from build_scoring_matrix
+    global_flag: True for global alignment, False for local alignment
+
+    return
+    ------
+    alignment matrix as a numpy array with shape (x+1, y+1),
+        int64 for integer scores, the same values as compute_alignment_matrix,
+        float64 for float scores, equal to compute_alignment_matrix up to
+        rounding in the last bits, so a tile may differ from the sum of
+        the tile it came from and a score; compute_global_alignment and
+        the other tracebacks allow for that, exact comparisons do not
+    """
+    rows = _iter_alignment_arrays(seq_x, seq_y, scores, global_flag)
+    first = next(rows)
+    matrix = np.empty((len(seq_x)+1, len(seq_y)+1), dtype=first.dtype)
+    matrix[0] = first
+    for row_i, row in enumerate(rows, 1):
+        matrix[row_i] = row
     return matrix
 
 
+def _transpose_scores(scores):
+    """Scoring matrix with rows and columns exchanged"""
+    transposed = {}
+    for row_c, row in scores.items():
+        for col_c, val in row.items():
+            transposed.setdefault(col_c, {})[row_c] = val
+    return transposed
+
+
+def compute_alignment_score(seq_x, seq_y, scores, global_flag):
+    """
+    Optimal alignment score without the alignment matrix,
+        only two rows along the shorter sequence are kept,
+        O(min(x, y)) memory
+
+    parameter
+    ---------
+    seq_x, seq_y: str, two string sequences
+    scores: scoring matrix from build_scoring_matrix
+    global_flag: True for global alignment, False for local alignment
+
+    return
+    ------
+    global: the bottom right value of compute_alignment_matrix
+    local: (score, row_i, col_j), the max value of compute_alignment_matrix
+        and its first position row by row, where the local alignment ends
+    """
+    swap = len(seq_y) > len(seq_x)
+    if swap:
+        seq_x, seq_y, scores = seq_y, seq_x, _transpose_scores(scores)
+
+    if global_flag:
+        return QueryProfile(seq_y, scores).score(seq_x, True)
+
+    max_val, max_i, max_j = float('-inf'), None, None
+    for row_i, row in enumerate(_iter_alignment_arrays(seq_x, seq_y, scores, False)):
+        col_j = int(np.argmax(row))
+        val = row[col_j].item()
+        # on swapped sequences the first position row by row is the lowest column
+        if val > max_val or (swap and val == max_val and col_j < max_j):
+            max_val, max_i, max_j = val, row_i, col_j
+
+    if swap:
+        max_i, max_j = max_j, max_i
+    return max_val, max_i, max_j
+
+
 def _matrix_max(matrix):
     """Finds the max value in a matrix along its indexes"""
     max_val = float('-inf')
@@ -115,50 +306,82 @@ def _matrix_max(matrix):
 
 def _compute_alignment(seq_x, seq_y, scores, aligns, kind='global'):
     """Internal alignment finding function"""
-    # start with empty sequences
-    _x2, _y2 = '', ''
+    if isinstance(aligns, np.ndarray):
+        cell = aligns.item
+    else:
+        cell = lambda row_i, col_j: aligns[row_i][col_j]
 
     # init the starting tile
     if kind == 'global':
         row_i, col_j = len(seq_x), len(seq_y)
-        score = aligns[row_i][col_j]
-    elif kind == 'local':
-        score, row_i, col_j = _matrix_max(aligns)
+    elif isinstance(aligns, np.ndarray):
+        row_i, col_j = np.unravel_index(np.argmax(aligns), aligns.shape)
+    elif isinstance(aligns, AlignmentMatrix):
+        _, row_i, col_j = aligns.max_cell
+    else:
+        _, row_i, col_j = _matrix_max(aligns)
+    score = cell(row_i, col_j)
+
+    _x2, _y2 = _traceback(seq_x, seq_y, scores, cell, row_i, col_j, kind == 'global')
+    return score, _x2, _y2
+
+
+def _is_zero(val):
+    """Is a tile value 0, up to the rounding of float scores"""
+    return abs(val) <= 1e-9
+
+
+def _traceback(seq_x, seq_y, scores, cell, row_i, col_j, global_flag):
+    """
+    Walk back from tile (row_i, col_j) of an alignment matrix
+
+    parameter
+    ---------
+    cell: function (row_i, col_j) -> value of the tile
+
+    return
+    ------
+    (X', Y'): the aligned sequences, built backwards in lists and
+        reversed once, linear in the alignment length
+
+    Every step takes the best of the three tiles the tile came from,
+        upper-left first, then top, so float matrices from the array
+        paths, whose last bits may differ from tile + score, walk the
+        same as exact ones.
+    """
+    pieces_x, pieces_y = [], []
 
     # traverse and creating the subsequence alone the DP table
     while row_i != 0 and col_j != 0:
-        _align = aligns[row_i][col_j]
-        if kind == 'local' and _align == 0:
+        if not global_flag and _is_zero(cell(row_i, col_j)):
             # early terminate when encounter the first zero
             break
 
-        if _align == aligns[row_i-1][col_j-1] + scores[seq_x[row_i-1]][seq_y[col_j-1]]:
-            _x2 = seq_x[row_i-1] + _x2
-            _y2 = seq_y[col_j-1] + _y2
+        diag = cell(row_i-1, col_j-1) + scores[seq_x[row_i-1]][seq_y[col_j-1]]
+        top = cell(row_i-1, col_j) + scores[seq_x[row_i-1]]['-']
+        left = cell(row_i, col_j-1) + scores['-'][seq_y[col_j-1]]
+        if diag >= top and diag >= left:
+            pieces_x.append(seq_x[row_i-1])
+            pieces_y.append(seq_y[col_j-1])
             row_i -= 1
-            col_j -=1
-        elif _align == aligns[row_i-1][col_j] + scores[seq_x[row_i-1]]['-']:
-            _x2 = seq_x[row_i-1] + _x2
-            _y2 = '-' + _y2
+            col_j -= 1
+        elif top >= left:
+            pieces_x.append(seq_x[row_i-1])
+            pieces_y.append('-')
             row_i -= 1
         else:
-            _x2 = '-' + _x2
-            _y2 = seq_y[col_j-1] + _y2
+            pieces_x.append('-')
+            pieces_y.append(seq_y[col_j-1])
             col_j -= 1
-    
+
     # pad in the remaing, only for global alignment
-    if kind == 'global':
-        while row_i != 0:
-            _x2 = seq_x[row_i-1] + _x2
-            _y2 = '-' + _y2
-            row_i -= 1
-        
-        while col_j != 0:
-            _x2 = '-' + _x2
-            _y2 = seq_y[col_j-1] + _y2
-            col_j -= 1
-    
-    return score, _x2, _y2
+    if global_flag:
+        pieces_x.extend(reversed(seq_x[:row_i]))
+        pieces_y.extend('-' * row_i)
+        pieces_x.extend('-' * col_j)
+        pieces_y.extend(reversed(seq_y[:col_j]))
+
+    return ''.join(reversed(pieces_x)), ''.join(reversed(pieces_y))
 
 
 def compute_global_alignment(seq_x, seq_y, scores, aligns):
@@ -208,3 +431,317 @@ def compute_local_alignment(seq_x, seq_y, scores, aligns):
     """
     return _compute_alignment(seq_x, seq_y, scores, aligns, kind='local')
 
+
+def compute_global_alignment_linear(seq_x, seq_y, scores):
+    """
+    Finds the optimal global alignment of two given sequences
+        in linear space, Hirschberg's divide and conquer
+
+    parameter
+    ---------
+    seq_x, seq_y: two sequences used to look for a global alignment
+    scores: scoring matrix that is used in alignments
+
+    return
+    ------
+    (score, X', Y'): tuple, same score as compute_global_alignment
+
+    rationale
+    ---------
+    The middle letter of seq_x is aligned where the forward scores of its
+        upper half plus the backward scores of its lower half peak, then
+        both halves recurse. Only score rows are kept, O(x + y) memory
+        for twice the time of the full matrix.
+    """
+    pieces_x, pieces_y = [], []
+    _hirschberg(seq_x, seq_y, scores, pieces_x, pieces_y)
+    _x2, _y2 = ''.join(pieces_x), ''.join(pieces_y)
+    score = sum(scores[char_x][char_y] for char_x, char_y in zip(_x2, _y2))
+    return score, _x2, _y2
+
+
+def _hirschberg(seq_x, seq_y, scores, pieces_x, pieces_y):
+    """Append the aligned pieces of seq_x and seq_y, left to right"""
+    len_x, len_y = len(seq_x), len(seq_y)
+    if len_x <= 1 or len_y <= 1 or len_x * len_y <= _HIRSCHBERG_CELLS:
+        aligns = compute_alignment_matrix(seq_x, seq_y, scores, True)
+        _, _x2, _y2 = compute_global_alignment(seq_x, seq_y, scores, aligns)
+        pieces_x.append(_x2)
+        pieces_y.append(_y2)
+        return
+
+    mid = len_x // 2
+    for upper in _iter_alignment_arrays(seq_x[:mid], seq_y, scores, True):
+        pass
+    for lower in _iter_alignment_arrays(seq_x[mid:][::-1], seq_y[::-1], scores, True):
+        pass
+    split = int(np.argmax(upper + lower[::-1]))
+
+    _hirschberg(seq_x[:mid], seq_y[:split], scores, pieces_x, pieces_y)
+    _hirschberg(seq_x[mid:], seq_y[split:], scores, pieces_x, pieces_y)
+
+
+def compute_banded_alignment_matrix(seq_x, seq_y, scores, global_flag, band_width):
+    """
+    Alignment matrix restricted to the band |i - j| <= band_width,
+        stored compactly, one row of 2 * band_width + 1 cells per letter
+        of seq_x
+
+    parameter
+    ---------
+    seq_x, seq_y: str, two string sequences
+    scores: scoring matrix from build_scoring_matrix
+    global_flag: True for global alignment, False for local alignment
+    band_width: w, the widest distance from the main diagonal
+
+    return
+    ------
+    band: array with shape (x+1, 2w+1), band[i][j - i + w] is cell (i, j)
+        cells outside the matrix hold -inf, or the lowest int64 / 4
+    """
+    profile = QueryProfile(seq_y, scores)
+    table, dash, gaps = profile.table(), profile.dash(), profile.gaps()
+    len_x, len_y = len(seq_x), len(seq_y)
+    if table.dtype == np.float64:
+        neg = float('-inf')
+    else:
+        neg = np.iinfo(np.int64).min // 4  # room for adding scores
+
+    # pair scores padded with a column, so diagonal moves into column 0 index fine
+    pairs = np.concatenate((profile.pairs(), np.zeros((len(table), 1), dtype=table.dtype)), axis=1)
+    offsets = np.arange(-band_width, band_width+1)
+    band = np.full((len_x+1, 2*band_width+1), neg, dtype=table.dtype)
+    cand = np.empty(2*band_width+1, dtype=table.dtype)
+    codes_x = profile.encode(seq_x)
+
+    for row_i in range(len_x+1):
+        cols = row_i + offsets
+        valid = (cols >= 0) & (cols <= len_y)
+        cols = np.clip(cols, 0, len_y)
+        if row_i == 0:
+            cand.fill(0 if not global_flag else neg)
+            cand[band_width] = 0
+        else:
+            code = codes_x[row_i-1]
+            prev = band[row_i-1]
+            cand[:-1] = prev[1:] + table[code, dash]  # top tile
+            cand[-1] = neg
+            diag = prev + pairs[code, cols-1]  # upper-left tile
+            diag[cols < 1] = neg
+            np.maximum(cand, diag, out=cand)
+            if not global_flag:
+                np.maximum(cand, 0, out=cand)
+        cand[~valid] = neg
+
+        # left tiles as a running max, see QueryProfile.rows
+        row = gaps[cols] + np.maximum.accumulate(cand - gaps[cols])
+        row[~valid] = neg
+        band[row_i] = row
+    return band
+
+
+def _banded_alignment(seq_x, seq_y, scores, band, global_flag):
+    """Trace back an alignment through a band from compute_banded_alignment_matrix"""
+    band_width = band.shape[1] // 2
+    if global_flag:
+        row_i, col_j = len(seq_x), len(seq_y)
+    else:
+        row_i, diag = np.unravel_index(np.argmax(band), band.shape)
+        col_j = row_i + diag - band_width
+
+    def cell(row_i, col_j):
+        """Tile (row_i, col_j) of the band, -inf off the band"""
+        diag = col_j - row_i + band_width
+        if 0 <= diag <= 2 * band_width:
+            return band.item(row_i, diag)
+        return float('-inf')
+
+    _x2, _y2 = _traceback(seq_x, seq_y, scores, cell, row_i, col_j, global_flag)
+    return cell(row_i, col_j), _x2, _y2
+
+
+def compute_banded_alignment(seq_x, seq_y, scores, global_flag, band_width, auto=False):
+    """
+    Optimal alignment of two sequences whose path stays in the band
+        |i - j| <= band_width, O(w * x) time and memory
+
+    parameter
+    ---------
+    seq_x, seq_y: str, two string sequences
+    scores: scoring matrix from build_scoring_matrix
+    global_flag: True for global alignment, False for local alignment
+    band_width: w, the widest distance from the main diagonal,
+        at least |x - y| for global alignment
+    auto: double the band until the score stops changing
+
+    return
+    ------
+    (score, X', Y'): tuple, as compute_global_alignment or
+        compute_local_alignment, the same once the band covers the matrix
+    """
+    len_x, len_y = len(seq_x), len(seq_y)
+    if global_flag and band_width < abs(len_x - len_y):
+        if not auto:
+            raise ValueError('band width %d below the length difference %d'
+                             % (band_width, abs(len_x - len_y)))
+        band_width = abs(len_x - len_y)
+    band_width = min(band_width, max(len_x, len_y))
+
+    band = compute_banded_alignment_matrix(seq_x, seq_y, scores, global_flag, band_width)
+    res = _banded_alignment(seq_x, seq_y, scores, band, global_flag)
+    while auto and band_width < max(len_x, len_y):
+        band_width = min(max(1, 2 * band_width), max(len_x, len_y))
+        band = compute_banded_alignment_matrix(seq_x, seq_y, scores, global_flag, band_width)
+        last, res = res, _banded_alignment(seq_x, seq_y, scores, band, global_flag)
+        if res[0] == last[0]:
+            break
+    return res
+
+
+def _iter_affine_rows(seq_x, seq_y, scores, gap_open, gap_extend, global_flag):
+    """
+    Generate the rows (H, E, F) of Gotoh's three alignment matrices
+        H best of any alignment of the prefixes
+        E best ending in a gap in seq_x, a letter of seq_y against '-'
+        F best ending in a gap in seq_y, a letter of seq_x against '-'
+
+    rationale
+    ---------
+    F and the diagonal only depend on the previous row. Along the row,
+        E[j] = max(E[j-1], H[j-1] + gap_open) + gap_extend, and H[j-1] only
+        beats E[j-1] through its other moves cand[j-1] as gap_open <= 0,
+        so E[j] = gap_open + j * gap_extend + max(cand[k] - k * gap_extend
+        for k < j), a running max like QueryProfile.rows.
+    """
+    if gap_open > 0:
+        raise ValueError('gap_open has to be a penalty, <= 0')
+    profile = QueryProfile(seq_y, scores)
+    dtype = profile.table().dtype
+    if dtype == np.float64 or isinstance(gap_open + gap_extend, float):
+        dtype, neg = np.float64, float('-inf')
+    else:
+        neg = np.iinfo(np.int64).min // 4  # room for adding scores
+    len_y = len(seq_y)
+    pairs = profile.pairs().astype(dtype)
+    steps = np.arange(len_y+1, dtype=dtype) * gap_extend
+
+    if global_flag:
+        row_h = gap_open + steps
+        row_h[0] = 0
+        row_e = row_h.copy()
+        row_e[0] = neg
+    else:
+        row_h = np.zeros(len_y+1, dtype=dtype)
+        row_e = np.full(len_y+1, neg, dtype=dtype)
+    row_f = np.full(len_y+1, neg, dtype=dtype)
+    yield row_h, row_e, row_f
+
+    cand = np.empty(len_y+1, dtype=dtype)
+    for code in profile.encode(seq_x):
+        row_f = np.maximum(row_f, row_h + gap_open) + gap_extend
+        cand[0] = row_f[0] if global_flag else 0
+        np.maximum(row_h[:-1] + pairs[code], row_f[1:], out=cand[1:])
+        if not global_flag:
+            np.maximum(cand, 0, out=cand)
+
+        row_e = np.empty(len_y+1, dtype=dtype)
+        row_e[0] = neg
+        row_e[1:] = gap_open + steps[1:] + np.maximum.accumulate(cand[:-1] - steps[:-1])
+        row_h = np.maximum(cand, row_e)
+        yield row_h, row_e, row_f
+
+
+def compute_affine_alignment_score(seq_x, seq_y, scores, gap_open, gap_extend, global_flag):
+    """
+    Optimal alignment score with affine gaps, only the current rows are kept
+
+    parameter
+    ---------
+    seq_x, seq_y: str, two string sequences
+    scores: scoring matrix from build_scoring_matrix, the '-' scores are unused
+    gap_open, gap_extend: a gap of length L scores gap_open + L * gap_extend,
+        gap_open <= 0
+    global_flag: True for global alignment, False for local alignment
+
+    return
+    ------
+    global: the optimal score
+    local: (score, row_i, col_j), the optimal score and the first cell
+        row by row where a local alignment with that score ends
+    """
+    rows = _iter_affine_rows(seq_x, seq_y, scores, gap_open, gap_extend, global_flag)
+    if global_flag:
+        for row_h, _, _ in rows:
+            pass
+        return row_h[-1].item()
+
+    max_val, max_i, max_j = float('-inf'), None, None
+    for row_i, (row_h, _, _) in enumerate(rows):
+        col_j = int(np.argmax(row_h))
+        if row_h[col_j] > max_val:
+            max_val, max_i, max_j = row_h[col_j].item(), row_i, col_j
+    return max_val, max_i, max_j
+
+
+def compute_affine_alignment(seq_x, seq_y, scores, gap_open, gap_extend, global_flag):
+    """
+    Optimal global or local alignment with affine gaps, Gotoh's algorithm
+
+    parameter
+    ---------
+    see compute_affine_alignment_score
+
+    return
+    ------
+    (score, X', Y'): tuple, as compute_global_alignment or compute_local_alignment
+    """
+    len_x, len_y = len(seq_x), len(seq_y)
+    rows = list(_iter_affine_rows(seq_x, seq_y, scores, gap_open, gap_extend, global_flag))
+    mat_h = np.array([row[0] for row in rows])
+    mat_e = np.array([row[1] for row in rows])
+    mat_f = np.array([row[2] for row in rows])
+
+    if global_flag:
+        row_i, col_j = len_x, len_y
+    else:
+        row_i, col_j = np.unravel_index(np.argmax(mat_h), mat_h.shape)
+    score = mat_h[row_i, col_j].item()
+
+    # every step takes the best move the tile came from, as _traceback does
+    pieces_x, pieces_y = [], []
+    state = 'H'
+    while row_i != 0 and col_j != 0:
+        if state == 'H':
+            if not global_flag and _is_zero(mat_h[row_i, col_j]):
+                break
+            diag = mat_h[row_i-1, col_j-1] + scores[seq_x[row_i-1]][seq_y[col_j-1]]
+            if diag >= mat_f[row_i, col_j] and diag >= mat_e[row_i, col_j]:
+                pieces_x.append(seq_x[row_i-1])
+                pieces_y.append(seq_y[col_j-1])
+                row_i -= 1
+                col_j -= 1
+            elif mat_f[row_i, col_j] >= mat_e[row_i, col_j]:
+                state = 'F'
+            else:
+                state = 'E'
+        elif state == 'F':
+            # gap opened here, or extended from above
+            if mat_h[row_i-1, col_j] + gap_open >= mat_f[row_i-1, col_j]:
+                state = 'H'
+            pieces_x.append(seq_x[row_i-1])
+            pieces_y.append('-')
+            row_i -= 1
+        else:
+            if mat_h[row_i, col_j-1] + gap_open >= mat_e[row_i, col_j-1]:
+                state = 'H'
+            pieces_x.append('-')
+            pieces_y.append(seq_y[col_j-1])
+            col_j -= 1
+
+    if global_flag:
+        pieces_x.extend(reversed(seq_x[:row_i]))
+        pieces_y.extend('-' * row_i)
+        pieces_x.extend('-' * col_j)
+        pieces_y.extend(reversed(seq_y[:col_j]))
+
+    return score, ''.join(reversed(pieces_x)), ''.join(reversed(pieces_y))
@@ -0,0 +1,178 @@
+"""
+Searching a database of sequences with one query
+
+The query is encoded once as an alignment.QueryProfile, every target is
+scored in score-only mode, and only the best hits are traced back.
+
+Permutation tests compare an alignment score with the scores of
+shuffled copies of one sequence, in score-only mode.
+"""
+import heapq
+import math
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import alignment
+
+# targets scored per pool task
+CHUNK_TARGETS = 64
+
+# shuffled sequences scored per pool task
+CHUNK_TRIALS = 16
+
+
+def _score_targets(task):
+    """
+    Scores of a chunk of targets, task is (profile, targets, global_flag)
+
+    Tasks carry their whole state, so workers work the same whether the
+        pool forks or spawns them. Every target is pickled once.
+    """
+    profile, targets, global_flag = task
+    return [profile.score(target, global_flag) for target in targets]
+
+
+def score_database(query, targets, scores, global_flag=False, max_workers=1):
+    """
+    Alignment score of a query against every target
+
+    parameter
+    ---------
+    query: str, the sequence searched for
+    targets: list of str, the database
+    scores: scoring matrix from build_scoring_matrix
+    global_flag: True for global alignment, False for local alignment
+    max_workers: size of the process pool, 1 scores in this process,
+        None one worker per cpu
+
+    return
+    ------
+    list of scores in the order of targets, the same as the scores of
+        compute_global_alignment or compute_local_alignment of (query, target)
+    """
+    # targets run along the rows, so the query columns see the scores transposed
+    profile = alignment.QueryProfile(query, alignment._transpose_scores(scores))
+    tasks = [(profile, targets[start:start + CHUNK_TARGETS], global_flag)
+             for start in range(0, len(targets), CHUNK_TARGETS)]
+    if max_workers == 1:
+        results = [_score_targets(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers) as executor:
+            results = list(executor.map(_score_targets, tasks))
+    return [score for chunk in results for score in chunk]
+
+
+def search_database(query, targets, scores, num_hits=10, global_flag=False, max_workers=1):
+    """
+    Find the targets that align best with a query
+
+    parameter
+    ---------
+    query: str, the sequence searched for
+    targets: list of str, the database
+    scores: scoring matrix from build_scoring_matrix
+    num_hits: number of hits returned
+    global_flag: True for global alignment, False for local alignment
+    max_workers: size of the process pool, see score_database
+
+    return
+    ------
+    list of (score, target index, query', target'), best score first,
+        ties by target index, aligned as compute_global_alignment
+        or compute_local_alignment of (query, target) does
+    """
+    target_scores = score_database(query, targets, scores, global_flag, max_workers)
+    best = heapq.nsmallest(num_hits, range(len(targets)), key=lambda idx: (-target_scores[idx], idx))
+
+    hits = []
+    for idx in best:
+        aligns = alignment.fast_compute_alignment_matrix(query, targets[idx], scores, global_flag)
+        if global_flag:
+            score, _x2, _y2 = alignment.compute_global_alignment(query, targets[idx], scores, aligns)
+        else:
+            score, _x2, _y2 = alignment.compute_local_alignment(query, targets[idx], scores, aligns)
+        hits.append((score, idx, _x2, _y2))
+    return hits
+
+
+def _null_scores(task):
+    """
+    Scores of shuffled sequences, one per seed,
+        task is (profile, letters, global_flag, seeds), see _score_targets
+    """
+    profile, letters, global_flag, seeds = task
+    res = []
+    for seed in seeds:
+        shuffled = ''.join(letters[np.random.RandomState(seed).permutation(len(letters))])
+        res.append(profile.score(shuffled, global_flag))
+    return res
+
+
+def generate_null_distribution(seq_x, seq_y, scores, num_trials, global_flag=False, seed=None, max_workers=1):
+    """
+    Scores of seq_x against num_trials random shuffles of seq_y
+
+    parameter
+    ---------
+    seq_x, seq_y: str, the shuffles are of seq_y
+    scores: scoring matrix from build_scoring_matrix
+    num_trials: number of shuffles
+    global_flag: True for global alignment, False for local alignment
+    seed: random seed, the same seed gives the same distribution
+        with any number of workers
+    max_workers: size of the process pool, see score_database
+
+    return
+    ------
+    dict of score -> number of trials with that score
+    """
+    seeds = np.random.RandomState(seed).randint(0, 2 ** 31 - 1, size=num_trials).tolist()
+
+    # shuffles run along the rows, so the seq_x columns see the scores transposed
+    profile = alignment.QueryProfile(seq_x, alignment._transpose_scores(scores))
+    letters = np.array(list(seq_y))
+    tasks = [(profile, letters, global_flag, seeds[start:start + CHUNK_TRIALS])
+             for start in range(0, num_trials, CHUNK_TRIALS)]
+    if max_workers == 1:
+        results = [_null_scores(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers) as executor:
+            results = list(executor.map(_null_scores, tasks))
+
+    dist = {}
+    for chunk in results:
+        for score in chunk:
+            dist[score] = dist.get(score, 0) + 1
+    return dist
+
+
+def permutation_test(seq_x, seq_y, scores, num_trials=1000, global_flag=False, seed=None, max_workers=1):
+    """
+    Empirical significance of the alignment score of two sequences
+
+    parameter
+    ---------
+    see generate_null_distribution
+
+    return
+    ------
+    dict with
+        score: alignment score of seq_x and seq_y
+        null: the null distribution, score -> number of trials
+        mean, stdev: of the null distribution
+        zscore: (score - mean) / stdev, for a constant null distribution
+            0 at its value, else inf with the sign of score - mean
+    """
+    if num_trials < 1:
+        raise ValueError('num_trials has to be at least 1, got %r' % num_trials)
+    score = alignment.compute_alignment_score(seq_x, seq_y, scores, global_flag)
+    if not global_flag:
+        score = score[0]
+    dist = generate_null_distribution(seq_x, seq_y, scores, num_trials, global_flag, seed, max_workers)
+
+    mean = sum(val * count for val, count in dist.items()) / float(num_trials)
+    stdev = math.sqrt(sum((val - mean) ** 2 * count for val, count in dist.items()) / float(num_trials))
+    if stdev > 0:
+        zscore = (score - mean) / stdev
+    else:
+        zscore = math.copysign(float('inf'), score - mean) if score != mean else 0.0
+    return dict(score=score, null=dist, mean=mean, stdev=stdev, zscore=zscore)
@@ -0,0 +1,572 @@
+"""
+Timing benchmarks for the Algorithmic Thinking modules
+
+Run from this directory, e.g.
+    python benchmark.py closest_pair
+"""
+import os
+import sys
+import shutil
+import tempfile
+import time
+import random
+import string
+import numpy as np
+import pair
+import alg_cluster
+import alg_project3_viz
+import data_loader
+import cluster_runner
+import alignment
+import alignment_search
+import word_check
+import cc_gr
+import graph_gen
+import graph_degree
+import csr_graph
+
+
+def timed(func, *args, **kwargs):
+    """Return (seconds spent, result) of one function call"""
+    start = time.time()
+    res = func(*args, **kwargs)
+    return time.time() - start, res
+
+
+def bench_closest_pair(sizes=(100, 1000, 2000, 10000, 100000, 1000000)):
+    """
+    slow_closest_pair vs fast_closest_pair vs array_closest_pair
+    on uniformly random points, the quadratic ones are capped
+    """
+    print '%10s %12s %12s %12s' % ('n', 'slow', 'fast', 'array')
+    for num in sizes:
+        points = [(random.random(), random.random()) for _ in range(num)]
+        points.sort()
+        clusters = pair.create_dummy_clusters(points)
+        horiz = [pt[0] for pt in points]
+        vert = [pt[1] for pt in points]
+
+        row = ['%10d' % num]
+        for func, cap in [(pair.slow_closest_pair, 2000), (pair.fast_closest_pair, 10000)]:
+            if num <= cap:
+                row.append('%12.4f' % timed(func, clusters)[0])
+            else:
+                row.append('%12s' % '-')
+        row.append('%12.4f' % timed(pair.closest_pair_arrays, horiz, vert)[0])
+        print ' '.join(row)
+
+
+def load_clusters(data):
+    """Return the singleton clusters of one of the course data tables"""
+    data_table = alg_project3_viz.load_data_table(alg_project3_viz.DATA[data])
+    return [alg_cluster.Cluster(set([line[0]]), line[1], line[2], line[3], line[4])
+            for line in data_table]
+
+
+def fips_tuples(clusters):
+    """Set of sorted fips tuples, for comparing clusterings"""
+    return set(tuple(sorted(cluster.fips_codes())) for cluster in clusters)
+
+
+def bench_hierarchical(datasets=('111', '290', '896', '3108'), num_k=15):
+    """
+    hierarchical_clustering vs fast_hierarchical_clustering
+    down to num_k clusters, merges per second and same output check
+    """
+    print '%6s %10s %10s %12s %12s %6s' % ('data', 'slow', 'fast', 'slow m/s', 'fast m/s', 'same')
+    for data in datasets:
+        merges = len(load_clusters(data)) - num_k
+        slow_time, slow = timed(pair.hierarchical_clustering, load_clusters(data), num_k)
+        fast_time, fast = timed(pair.fast_hierarchical_clustering, load_clusters(data), num_k)
+        print '%6s %10.3f %10.3f %12.1f %12.1f %6s' % (
+            data, slow_time, fast_time, merges / slow_time, merges / fast_time,
+            fips_tuples(slow) == fips_tuples(fast))
+
+
+def bench_kmeans(datasets=('896', '3108'), num_k=15, num_iter=5, sizes=(10 ** 5, 10 ** 6)):
+    """
+    kmeans_clustering vs fast_kmeans_clustering on the course data,
+    then fast_kmeans_clustering alone on random points for 100 iterations
+    """
+    print '%8s %10s %10s %6s' % ('data', 'slow', 'fast', 'same')
+    for data in datasets:
+        clusters = load_clusters(data)
+        slow_time, slow = timed(pair.kmeans_clustering, clusters, num_k, num_iter)
+        fast_time, fast = timed(pair.fast_kmeans_clustering, clusters, num_k, num_iter)
+        print '%8s %10.3f %10.3f %6s' % (data, slow_time, fast_time, fips_tuples(slow) == fips_tuples(fast))
+
+    for num in sizes:
+        clusters = pair.create_dummy_clusters([(random.random(), random.random()) for _ in range(num)])
+        print '%8d %10s %10.3f' % (num, '-', timed(pair.fast_kmeans_clustering, clusters, num_k, 100)[0])
+
+
+def bench_kmeans_assign(num=10 ** 5, ks=(15, 50, 100, 500, 1000, 2000), num_iter=20):
+    """
+    brute vs hamerly nearest center assignment of the
+    vectorized k-means, random points with random populations
+    """
+    horiz = np.random.rand(num)
+    vert = np.random.rand(num)
+    weights = np.random.randint(1, 10 ** 5, num).astype(np.float64)
+    print '%6s %10s %10s %6s' % ('k', 'brute', 'hamerly', 'same')
+    for num_k in ks:
+        inits = np.argsort(weights, kind='mergesort')[-num_k:]
+        results = []
+        for assign in ('brute', 'hamerly'):
+            results.append(timed(pair._kmeans_arrays, horiz, vert, weights,
+                                 horiz[inits], vert[inits], num_iter, assign))
+        print '%6d %10.3f %10.3f %6s' % (num_k, results[0][0], results[1][0],
+                                         (results[0][1][0] == results[1][1][0]).all())
+
+
+def bench_distortion(datasets=('290', '896', '3108'), ks=range(6, 21)):
+    """
+    distortion curve over k: per cluster cluster_error calls
+    vs compute_distortion with one prebuilt fips index
+    """
+    print '%6s %10s %10s' % ('data', 'per error', 'indexed')
+    for data in datasets:
+        data_table = alg_project3_viz.load_data_table(alg_project3_viz.DATA[data])
+        results = dict((num_k, pair.fast_kmeans_clustering(load_clusters(data), num_k, 5)) for num_k in ks)
+
+        def per_error():
+            return [sum(c.cluster_error(data_table) for c in results[num_k]) for num_k in ks]
+
+        def indexed():
+            index = pair.build_fips_index(data_table)
+            return [pair.compute_distortion(results[num_k], data_table, index) for num_k in ks]
+
+        print '%6s %10.3f %10.3f' % (data, timed(per_error)[0], timed(indexed)[0])
+
+
+def bench_distortion_curve(datasets=('896', '3108'), ks=range(6, 21)):
+    """
+    hierarchical distortion for every k: one fast_hierarchical_clustering
+    run per k vs one hierarchical_distortion_curve run
+    """
+    print '%6s %10s %10s' % ('data', 'per k', 'one run')
+    for data in datasets:
+        data_table = alg_project3_viz.load_data_table(alg_project3_viz.DATA[data])
+
+        def per_k():
+            index = pair.build_fips_index(data_table)
+            return [pair.compute_distortion(pair.fast_hierarchical_clustering(load_clusters(data), num_k),
+                                            data_table, index) for num_k in ks]
+
+        def one_run():
+            return pair.hierarchical_distortion_curve(load_clusters(data), data_table, ks)
+
+        print '%6s %10.3f %10.3f' % (data, timed(per_k)[0], timed(one_run)[0])
+
+
+def bench_load(repeat=640):
+    """
+    load_data_table vs streaming load_cancer_table vs its memory-mapped
+    cache, on the 3108 table repeated into a 2 million line file
+    """
+    data_url = os.path.join(tempfile.mkdtemp(), 'cancer.csv')
+    with open(alg_project3_viz.DATA['3108']) as data_file:
+        lines = data_file.read().strip()
+    with open(data_url, 'w') as data_file:
+        data_file.write('\n'.join([lines] * repeat))
+
+    print '%10s %12s %12s %12s' % ('lines', 'list', 'streaming', 'cached')
+    list_time = timed(alg_project3_viz.load_data_table, data_url)[0]
+    stream_time = timed(data_loader.load_cancer_table, data_url, cache=True)[0]
+    cache_time = timed(data_loader.load_cancer_table, data_url, cache=True)[0]
+    print '%10d %12.3f %12.3f %12.4f' % (3108 * repeat, list_time, stream_time, cache_time)
+    shutil.rmtree(os.path.dirname(data_url))
+
+
+def bench_minibatch(repeat=640, num_k=15, num_iter=5):
+    """
+    mini-batch k-means over a memory-mapped 2 million record table,
+    the 3108 table repeated with jittered coordinates
+    """
+    data_url = os.path.join(tempfile.mkdtemp(), 'cancer.csv')
+    records = data_loader.load_cancer_table(alg_project3_viz.DATA['3108'])
+    table = np.lib.format.open_memmap(data_url + '.npy', mode='w+', dtype=records.dtype,
+                                      shape=(len(records) * repeat,))
+    for idx in range(repeat):
+        chunk = records.copy()
+        chunk['horiz'] += np.random.rand(len(chunk))
+        chunk['vert'] += np.random.rand(len(chunk))
+        table[idx * len(records):(idx + 1) * len(records)] = chunk
+    table.flush()
+    table = np.load(data_url + '.npy', mmap_mode='r')
+
+    print '%10s %10s %10s' % ('records', 'batch', 'seconds')
+    for batch_size in (2 ** 14, 2 ** 16, 2 ** 18):
+        seconds = timed(pair.minibatch_kmeans_clustering, table, num_k, num_iter, batch_size)[0]
+        print '%10d %10d %10.3f' % (len(table), batch_size, seconds)
+    del table
+    shutil.rmtree(os.path.dirname(data_url))
+
+
+def bench_runner(datasets=('290', '896', '3108'), ks=range(6, 21), seeds=range(4)):
+    """
+    sweep of k-means restarts over datasets, k and seeds,
+    serial vs cluster_runner process pool
+    """
+    configs = [(alg_project3_viz.DATA[data], 'kmeans', num_k, 5, seed)
+               for data in datasets for num_k in ks for seed in seeds]
+    print '%8s %10s %10s' % ('configs', 'serial', 'pool')
+    serial_time = timed(cluster_runner.run_configs, configs, 1)[0]
+    pool_time = timed(cluster_runner.run_configs, configs)[0]
+    print '%8d %10.3f %10.3f' % (len(configs), serial_time, pool_time)
+
+
+def random_sequence(num, alph='ACGT'):
+    """Random sequence of num letters"""
+    return ''.join(random.choice(alph) for _ in range(num))
+
+
+def bench_alignment_score(sizes=((500, 500), (2000, 2000), (100000, 20))):
+    """
+    local alignment score from the full compute_alignment_matrix
+    vs two row compute_alignment_score, the full matrix is capped
+    """
+    scores = alignment.build_scoring_matrix(set('ACGT'), 10, 4, -6)
+    print '%8s %8s %10s %10s %6s' % ('x', 'y', 'matrix', 'two rows', 'same')
+    for len_x, len_y in sizes:
+        seq_x, seq_y = random_sequence(len_x), random_sequence(len_y)
+        row_time, res = timed(alignment.compute_alignment_score, seq_x, seq_y, scores, False)
+        if len_x * len_y <= 4 * 10 ** 6:
+            matrix_time, aligns = timed(alignment.compute_alignment_matrix, seq_x, seq_y, scores, False)
+            print '%8d %8d %10.3f %10.3f %6s' % (len_x, len_y, matrix_time, row_time,
+                                                 alignment._matrix_max(aligns) == res)
+        else:
+            print '%8d %8d %10s %10.3f' % (len_x, len_y, '-', row_time)
+
+
+def bench_global_alignment(sizes=((500, 500), (2000, 2000), (20000, 200))):
+    """
+    global alignment with the full matrix traceback
+    vs linear space compute_global_alignment_linear
+    """
+    scores = alignment.build_scoring_matrix(set('ACGT'), 10, 4, -6)
+    print '%8s %8s %10s %10s %6s' % ('x', 'y', 'matrix', 'linear', 'same')
+    for len_x, len_y in sizes:
+        seq_x, seq_y = random_sequence(len_x), random_sequence(len_y)
+
+        def full():
+            aligns = alignment.compute_alignment_matrix(seq_x, seq_y, scores, True)
+            return alignment.compute_global_alignment(seq_x, seq_y, scores, aligns)
+
+        matrix_time, res = timed(full)
+        linear_time, linear = timed(alignment.compute_global_alignment_linear, seq_x, seq_y, scores)
+        print '%8d %8d %10.3f %10.3f %6s' % (len_x, len_y, matrix_time, linear_time, res[0] == linear[0])
+
+
+def bench_alignment_matrix(sizes=(500, 2000, 5000)):
+    """
+    compute_alignment_matrix vs numpy fast_compute_alignment_matrix,
+    square random DNA inputs, global and local
+    """
+    scores = alignment.build_scoring_matrix(set('ACGT'), 10, 4, -6)
+    print '%6s %8s %10s %10s %6s' % ('n', 'global', 'lists', 'numpy', 'same')
+    for num in sizes:
+        seq_x, seq_y = random_sequence(num), random_sequence(num)
+        for global_flag in (True, False):
+            list_time, aligns = timed(alignment.compute_alignment_matrix, seq_x, seq_y, scores, global_flag)
+            fast_time, fast = timed(alignment.fast_compute_alignment_matrix, seq_x, seq_y, scores, global_flag)
+            print '%6d %8s %10.3f %10.3f %6s' % (num, global_flag, list_time, fast_time, fast.tolist() == aligns)
+
+
+def bench_search(num_targets=500, len_query=300, len_target=300, num_hits=10):
+    """
+    one query against a random database: matrix plus local traceback
+    per target vs search_database, serial and on a process pool
+    """
+    scores = alignment.build_scoring_matrix(set('ACGT'), 10, 4, -6)
+    query = random_sequence(len_query)
+    targets = [random_sequence(len_target) for _ in range(num_targets)]
+
+    def per_target():
+        results = []
+        for idx, target in enumerate(targets):
+            aligns = alignment.compute_alignment_matrix(query, target, scores, False)
+            results.append(alignment.compute_local_alignment(query, target, scores, aligns) + (idx,))
+        return sorted(results, key=lambda res: (-res[0], res[3]))[:num_hits]
+
+    print '%8s %10s %10s %10s' % ('targets', 'per target', 'profile', 'pool')
+    slow_time = timed(per_target)[0]
+    fast_time = timed(alignment_search.search_database, query, targets, scores, num_hits)[0]
+    pool_time = timed(alignment_search.search_database, query, targets, scores, num_hits, max_workers=None)[0]
+    print '%8d %10.3f %10.3f %10.3f' % (num_targets, slow_time, fast_time, pool_time)
+
+
+def bench_banded(sizes=(2000, 5000, 20000), num_edits=20, band_width=8):
+    """
+    global alignment of a sequence and a copy with a few edits:
+    full numpy matrix traceback vs banded alignment with auto doubling
+    """
+    scores = alignment.build_scoring_matrix(set('ACGT'), 5, -4, -8)
+    print '%8s %10s %10s %6s' % ('n', 'full', 'banded', 'same')
+    for num in sizes:
+        seq_x = random_sequence(num)
+        edited = list(seq_x)
+        for _ in range(num_edits):
+            pos = random.randrange(len(edited))
+            if random.random() < 0.5:
+                edited[pos] = random.choice('ACGT')
+            else:
+                del edited[pos]
+        seq_y = ''.join(edited)
+
+        band_time, res = timed(alignment.compute_banded_alignment, seq_x, seq_y, scores, True, band_width, True)
+        if num <= 5000:
+            def full():
+                aligns = alignment.fast_compute_alignment_matrix(seq_x, seq_y, scores, True).tolist()
+                return alignment.compute_global_alignment(seq_x, seq_y, scores, aligns)
+            full_time, expected = timed(full)
+            print '%8d %10.3f %10.3f %6s' % (num, full_time, band_time, res[0] == expected[0])
+        else:
+            print '%8d %10s %10.3f' % (num, '-', band_time)
+
+
+def bench_permutation(len_x=300, len_y=300, num_trials=200):
+    """
+    local alignment null distribution: matrix plus traceback per shuffle,
+    as in application #4, vs the score-only permutation test
+    """
+    scores = alignment.build_scoring_matrix(set('ACGT'), 10, 4, -6)
+    seq_x, seq_y = random_sequence(len_x), random_sequence(len_y)
+
+    def per_shuffle():
+        dist = {}
+        rand_y = list(seq_y)
+        for _ in range(num_trials):
+            random.shuffle(rand_y)
+            aligns = alignment.compute_alignment_matrix(seq_x, ''.join(rand_y), scores, False)
+            score = alignment.compute_local_alignment(seq_x, ''.join(rand_y), scores, aligns)[0]
+            dist[score] = dist.get(score, 0) + 1
+        return dist
+
+    print '%8s %10s %10s %10s' % ('trials', 'traceback', 'score', 'pool')
+    slow_time = timed(per_shuffle)[0]
+    fast_time = timed(alignment_search.permutation_test, seq_x, seq_y, scores, num_trials)[0]
+    pool_time = timed(alignment_search.permutation_test, seq_x, seq_y, scores, num_trials, max_workers=None)[0]
+    print '%8d %10.3f %10.3f %10.3f' % (num_trials, slow_time, fast_time, pool_time)
+
+
+def bench_affine(sizes=(1000, 5000, 10000)):
+    """
+    score-only alignment with linear gaps vs affine gaps,
+    both vectorized row by row, global and local
+    """
+    scores = alignment.build_scoring_matrix(set('ACGT'), 5, -3, -1)
+    print '%6s %8s %10s %10s' % ('n', 'global', 'linear', 'affine')
+    for num in sizes:
+        seq_x, seq_y = random_sequence(num), random_sequence(num)
+        for global_flag in (True, False):
+            linear_time = timed(alignment.compute_alignment_score, seq_x, seq_y, scores, global_flag)[0]
+            affine_time = timed(alignment.compute_affine_alignment_score, seq_x, seq_y, scores, -10, -1, global_flag)[0]
+            print '%6d %8s %10.3f %10.3f' % (num, global_flag, linear_time, affine_time)
+
+
+def bench_traceback(sizes=(10 ** 4, 10 ** 5, 10 ** 6)):
+    """
+    global traceback of a long sequence against a short one,
+    the alignment is as long as the sequence, time should grow linearly
+    """
+    scores = alignment.build_scoring_matrix(set('ACGT'), 10, 4, -6)
+    print '%8s %10s %10s' % ('n', 'matrix', 'traceback')
+    for num in sizes:
+        seq_x, seq_y = random_sequence(num), random_sequence(4)
+        matrix_time, aligns = timed(alignment.fast_compute_alignment_matrix, seq_x, seq_y, scores, True)
+        trace_time = timed(alignment.compute_global_alignment, seq_x, seq_y, scores, aligns)[0]
+        print '%8d %10.3f %10.3f' % (num, matrix_time, trace_time)
+
+
+def bench_word_check(num_words=10 ** 5, queries=('humble', 'firefly', 'algorithm'), dist=2):
+    """
+    words within an edit distance of a query: one alignment matrix per
+    dictionary word, as in application #4, vs the WordChecker trie
+    """
+    rand = random.Random(0)
+    words = set()
+    while len(words) < num_words:
+        words.add(''.join(rand.choice(string.ascii_lowercase) for _ in range(rand.randint(2, 10))))
+    checker = word_check.WordChecker(words)
+    scores = checker.scores
+
+    def per_word(query):
+        res = set()
+        for word in words:
+            aligns = alignment.compute_alignment_matrix(query, word, scores, True)
+            score = alignment.compute_global_alignment(query, word, scores, aligns)[0]
+            if len(query) + len(word) - score <= dist:
+                res.add(word)
+        return res
+
+    print '%10s %10s %10s %6s' % ('query', 'per word', 'trie', 'same')
+    for query in queries:
+        slow_time, slow = timed(per_word, query)
+        fast_time, fast = timed(checker.check, query, dist)
+        print '%10s %10.3f %10.4f %6s' % (query, slow_time, fast_time, slow == set(fast))
+
+
+def bench_resilience(sizes=(1000, 5000, 10 ** 5), init_nodes=5):
+    """
+    compute_resilience vs union-find fast_compute_resilience
+    on UPA graphs under a random attack of every node
+    """
+    print '%8s %10s %10s %6s' % ('n', 'rebuild', 'union', 'same')
+    for num in sizes:
+        graph = graph_gen.algo_upa(num, init_nodes)
+        order = cc_gr.random_order(graph)
+        fast_time, fast = timed(cc_gr.fast_compute_resilience, graph, order)
+        if num <= 5000:
+            slow_time, slow = timed(cc_gr.compute_resilience, graph, order)
+            print '%8d %10.3f %10.3f %6s' % (num, slow_time, fast_time, slow == fast)
+        else:
+            print '%8d %10s %10.3f' % (num, '-', fast_time)
+
+
+def dict_graph_bytes(graph):
+    """Bytes of a dict of sets graph, int objects not counted"""
+    return sys.getsizeof(graph) + sum(sys.getsizeof(neighs) for neighs in graph.values())
+
+
+def bench_csr(sizes=(10 ** 5, 10 ** 6), avg_degree=10):
+    """
+    random undirected graphs as dict of sets vs CSRGraph: memory,
+    connected components and in-degree distribution, dict capped
+    """
+    print '%8s %10s %10s %10s %10s %10s %10s' % ('n', 'dict MB', 'csr MB', 'dict cc', 'csr cc',
+                                               'dict dist', 'csr dist')
+    for num in sizes:
+        sources = np.random.randint(0, num, num * avg_degree // 2)
+        targets = np.random.randint(0, num, num * avg_degree // 2)
+        keep = sources != targets
+        graph = csr_graph.CSRGraph.from_edges(sources[keep], targets[keep], num, undirected=True)
+        csr_cc = timed(csr_graph.cc_visited, graph)[0]
+        csr_dist = timed(csr_graph.in_degree_distribution, graph)[0]
+        row = [num, '-', graph.nbytes() / 2.0 ** 20, '-', csr_cc, '-', csr_dist]
+        if num <= 10 ** 5:
+            dict_graph = graph.to_dict()
+            row[1] = '%10.1f' % (dict_graph_bytes(dict_graph) / 2.0 ** 20)
+            row[3] = '%10.3f' % timed(cc_gr.cc_visited, dict_graph)[0]
+            row[5] = '%10.3f' % timed(graph_degree.in_degree_distribution, dict_graph)[0]
+        print '%8d %10s %10.1f %10s %10.3f %10s %10.3f' % tuple(row)
+
+
+CITATION_URL = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'alg_phys-cite.txt')
+
+
+def load_citation_dict(data_url=CITATION_URL):
+    """Read the citation graph into a dict of sets, as citation_graph.ipynb does"""
+    digraph = {}
+    with open(data_url) as data_file:
+        for line in data_file:
+            cit_lst = [int(item) for item in line.split()]
+            digraph[cit_lst[0]] = digraph.get(cit_lst[0], set()).union(cit_lst[1:])
+    return digraph
+
+
+def bench_in_degree():
+    """
+    citation graph: reading the text file vs in-degree distribution
+    with dict counting and with the bincount array path
+    """
+    load_time, digraph = timed(load_citation_dict)
+    dict_time, dist = timed(graph_degree.in_degree_distribution, digraph)
+    array_time, fast = timed(graph_degree.fast_in_degree_distribution, digraph)
+    log_time = timed(graph_degree.log_binned_distribution, fast)[0]
+    print '%8s %10s %10s %10s %10s %6s' % ('nodes', 'load', 'dict', 'array', 'log bins', 'same')
+    print '%8d %10.3f %10.3f %10.3f %10.4f %6s' % (len(digraph), load_time, dict_time, array_time,
+                                                   log_time, dist == fast)
+
+
+def bench_graph_load(repeat=8):
+    """
+    citation graph read into a dict of sets vs streaming load_graph vs its
+    memory-mapped cache, on copies of alg_phys-cite.txt with shifted node names
+    """
+    data_url = os.path.join(tempfile.mkdtemp(), 'cite.txt')
+    digraph = load_citation_dict()
+    shift = max(node for neighs in digraph.values() for node in neighs | set([max(digraph)])) + 1
+    with open(data_url, 'w') as data_file:
+        for copy in range(repeat):
+            for node, neighs in digraph.items():
+                data_file.write(' '.join(str(item + copy * shift) for item in [node] + sorted(neighs)) + '\n')
+
+    print '%10s %10s %10s %10s %10s %12s %12s' % ('lines', 'dict', 'streaming', 'cached',
+                                                 'hash', 'dict MB', 'csr MB')
+    dict_time, graph = timed(load_citation_dict, data_url)
+    dict_bytes = dict_graph_bytes(graph)
+    del graph
+    stream_time, csr = timed(data_loader.load_graph, data_url, cache=True)
+    cache_time = timed(data_loader.load_graph, data_url, cache=True)[0]
+    hash_time = timed(data_loader.file_digest, data_url)[0]
+    print '%10d %10.3f %10.3f %10.4f %10.4f %12.1f %12.1f' % (len(digraph) * repeat, dict_time, stream_time,
+                                                            cache_time, hash_time, dict_bytes / 1e6,
+                                                            csr.nbytes() / 1e6)
+    shutil.rmtree(os.path.dirname(data_url))
+
+
+def bench_dpa(sizes=(10 ** 4, 10 ** 5, 10 ** 6), init_nodes=13, slow_cap=10 ** 5):
+    """
+    algo_dpa / algo_upa vs fast_algo_dpa / fast_algo_upa into a CSRGraph,
+    pure python capped at slow_cap nodes
+    """
+    print '%8s %6s %10s %10s %10s %10s %12s' % ('n', 'm', 'dpa', 'fast dpa', 'upa', 'fast upa', 'edges')
+    for num in sizes:
+        dpa_time = upa_time = float('nan')
+        if num <= slow_cap:
+            dpa_time = timed(graph_gen.algo_dpa, num, init_nodes)[0]
+            upa_time = timed(graph_gen.algo_upa, num, init_nodes)[0]
+        fast_dpa_time, graph = timed(graph_gen.fast_algo_dpa, num, init_nodes, seed=0)
+        fast_upa_time = timed(graph_gen.fast_algo_upa, num, init_nodes, seed=0)[0]
+        print '%8d %6d %10.3f %10.3f %10.3f %10.3f %12d' % (num, init_nodes, dpa_time, fast_dpa_time,
+                                                          upa_time, fast_upa_time, graph.num_edges())
+
+
+def bench_er(sizes=(10 ** 3, 3 * 10 ** 3, 10 ** 5, 10 ** 6), avg_degree=10, slow_cap=3 * 10 ** 3):
+    """
+    algo_er vs fast_algo_er at a fixed average degree,
+    pure python capped at slow_cap nodes
+    """
+    print '%8s %12s %10s %10s %12s' % ('n', 'p', 'er', 'fast er', 'edges')
+    for num in sizes:
+        prob = avg_degree / float(num - 1)
+        slow_time = float('nan')
+        if num <= slow_cap:
+            slow_time = timed(graph_gen.algo_er, num, prob)[0]
+        fast_time, graph = timed(graph_gen.fast_algo_er, num, prob, seed=0)
+        print '%8d %12.3g %10.3f %10.3f %12d' % (num, prob, slow_time, fast_time, graph.num_edges() // 2)
+
+
+BENCHMARKS = {
+    'closest_pair': bench_closest_pair,
+    'hierarchical': bench_hierarchical,
+    'distortion': bench_distortion,
+    'distortion_curve': bench_distortion_curve,
+    'kmeans': bench_kmeans,
+    'load': bench_load,
+    'minibatch': bench_minibatch,
+    'kmeans_assign': bench_kmeans_assign,
+    'runner': bench_runner,
+    'alignment_score': bench_alignment_score,
+    'global_alignment': bench_global_alignment,
+    'alignment_matrix': bench_alignment_matrix,
+    'search': bench_search,
+    'banded': bench_banded,
+    'permutation': bench_permutation,
+    'affine': bench_affine,
+    'traceback': bench_traceback,
+    'word_check': bench_word_check,
+    'resilience': bench_resilience,
+    'csr': bench_csr,
+    'in_degree': bench_in_degree,
+    'graph_load': bench_graph_load,
+    'dpa': bench_dpa,
+    'er': bench_er,
+}
+
+
+if __name__ == '__main__':
+    for name in sys.argv[1:] or sorted(BENCHMARKS):
+        print '==', name
+        BENCHMARKS[name]()
@@ -0,0 +1,100 @@
+"""
+Batch runner for clustering experiments
+
+Runs many (dataset, algorithm, k, num_iter, seed) configurations
+across a process pool and gathers the distortion and the wall time
+of each run into a results table.
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor
+import alg_cluster
+import pair
+import data_loader
+
+RESULT_FIELDS = ('dataset', 'algorithm', 'num_k', 'num_iter', 'seed', 'distortion', 'seconds')
+
+# per process cache of loaded tables, data url -> (records, rows, fips index)
+# filled before the pool starts, so forked workers inherit it instead of
+# receiving the tables pickled with every task
+_TABLES = {}
+
+
+def _load_table(data_url):
+    """Load a data table once per process"""
+    if data_url not in _TABLES:
+        records = data_loader.load_cancer_table(data_url)
+        rows = data_loader.table_rows(records)
+        _TABLES[data_url] = records, rows, pair.build_fips_index(rows)
+    return _TABLES[data_url]
+
+
+def run_config(config):
+    """
+    Run one clustering configuration
+
+    parameter
+    ---------
+    config: (dataset, algorithm, num_k, num_iter, seed)
+        dataset: path of a cancer risk csv file
+        algorithm: 'hierarch', 'kmeans' or 'minibatch'
+        num_iter: passes of 'kmeans' and 'minibatch', unused by 'hierarch'
+        seed: initial centers of 'kmeans', None for the most populous ones,
+            unused by 'hierarch' and 'minibatch'
+
+    return
+    ------
+    dict with the RESULT_FIELDS, unused num_iter and seed recorded as None
+    """
+    data_url, algo, num_k, num_iter, seed = config
+    if algo not in ('hierarch', 'kmeans', 'minibatch'):
+        raise ValueError("algorithm must be 'hierarch', 'kmeans' or 'minibatch', got %r" % algo)
+    if algo == 'hierarch':
+        num_iter = seed = None
+    elif algo == 'minibatch':
+        seed = None
+    records, rows, fips_index = _load_table(data_url)
+
+    start = time.time()
+    if algo == 'hierarch':
+        singletons = [alg_cluster.Cluster(set([line[0]]), line[1], line[2], line[3], line[4]) for line in rows]
+        cluster_list = pair.fast_hierarchical_clustering(singletons, num_k)
+    elif algo == 'kmeans':
+        singletons = [alg_cluster.Cluster(set([line[0]]), line[1], line[2], line[3], line[4]) for line in rows]
+        cluster_list = pair.fast_kmeans_clustering(singletons, num_k, num_iter, seed=seed)
+    elif algo == 'minibatch':
+        cluster_list = pair.minibatch_kmeans_clustering(records, num_k, num_iter, keep_fips=True)
+    distortion = pair.compute_distortion(cluster_list, rows, fips_index)
+
+    return dict(zip(RESULT_FIELDS, (data_url, algo, num_k, num_iter, seed, distortion, time.time() - start)))
+
+
+def run_configs(configs, max_workers=None):
+    """
+    Run many clustering configurations in parallel
+
+    parameter
+    ---------
+    configs: list of (dataset, algorithm, num_k, num_iter, seed), see run_config
+    max_workers: size of the process pool, 1 runs them in this process
+
+    return
+    ------
+    list of result dicts, in the order of configs
+    """
+    configs = [tuple(config) for config in configs]
+    for data_url in set(config[0] for config in configs):
+        _load_table(data_url)
+
+    if max_workers == 1:
+        return [run_config(config) for config in configs]
+
+    with ProcessPoolExecutor(max_workers) as executor:
+        return list(executor.map(run_config, configs))
+
+
+def format_results(results):
+    """Return the results table as aligned text, one run per line"""
+    lines = ['%-40s %10s %6s %9s %6s %14s %9s' % RESULT_FIELDS]
+    for res in results:
+        lines.append('%-40s %10s %6d %9s %6s %14.6e %9.3f' % tuple(res[field] for field in RESULT_FIELDS))
+    return '\n'.join(lines)
@@ -0,0 +1,254 @@
+"""
+Columnar representation of a list of clusters of counties
+
+Instead of one alg_cluster.Cluster object per cluster, a ClusterTable
+keeps parallel arrays of centers, populations and risks, one slot per
+cluster. County membership is a union-find forest over the county rows,
+so merging two clusters links two trees instead of copying fips sets.
+"""
+import numpy as np
+import alg_cluster
+
+
+class ClusterTable:
+    """
+    Table of clusters with columnar storage
+
+    parameter
+    ---------
+    fips: fips code of every county row
+    slots: slot (cluster) index of every county row
+    horiz, vert, population, risk: one value per slot
+    """
+
+    def __init__(self, fips, slots, horiz, vert, population, risk):
+        """Create a cluster table from its columns"""
+        self._fips = np.asarray(fips)
+        self._horiz = np.array(horiz, dtype=np.float64)
+        self._vert = np.array(vert, dtype=np.float64)
+        self._population = np.array(population, dtype=np.int64)
+        self._risk = np.array(risk, dtype=np.float64)
+        self._alive = np.ones(len(self._horiz), dtype=bool)
+
+        # union-find over rows, rows of a slot start in one tree
+        # whose root is the first row of the slot, -1 for no rows
+        slots = np.asarray(slots, dtype=np.intp)
+        num_rows = len(slots)
+        self._root = np.full(len(self._horiz), -1, dtype=np.intp)
+        used, firsts = np.unique(slots, return_index=True)
+        self._root[used] = firsts
+        self._parent = self._root[slots] if num_rows else np.arange(0)
+        self._rank = np.zeros(num_rows, dtype=np.int8)
+        self._rank[self._root[self._root >= 0]] = 1
+
+    def __len__(self):
+        """Number of clusters in the table"""
+        return int(np.count_nonzero(self._alive))
+
+    def __repr__(self):
+        """Short description of the table"""
+        return "ClusterTable(%d clusters, %d counties)" % (len(self), len(self._fips))
+
+    @classmethod
+    def from_clusters(cls, clusters):
+        """Build a table from a list of alg_cluster.Cluster"""
+        fips, slots = [], []
+        for idx, cluster in enumerate(clusters):
+            codes = sorted(cluster.fips_codes())
+            fips.extend(codes)
+            slots.extend([idx] * len(codes))
+        return cls(fips, slots,
+                   [cluster.horiz_center() for cluster in clusters],
+                   [cluster.vert_center() for cluster in clusters],
+                   [cluster.total_population() for cluster in clusters],
+                   [cluster.averaged_risk() for cluster in clusters])
+
+    @classmethod
+    def from_data_table(cls, data_table):
+        """Build a table of singleton clusters from rows of [fips, x, y, population, risk]"""
+        return cls([line[0] for line in data_table], range(len(data_table)),
+                   [line[1] for line in data_table], [line[2] for line in data_table],
+                   [line[3] for line in data_table], [line[4] for line in data_table])
+
+    @classmethod
+    def from_records(cls, table):
+        """Build a table of singleton clusters from a data_loader.load_cancer_table record array"""
+        return cls(table['fips'], np.arange(len(table)), table['horiz'], table['vert'],
+                   table['population'], table['risk'])
+
+    def to_clusters(self):
+        """Return the live clusters as a list of alg_cluster.Cluster"""
+        clusters = []
+        offsets, rows = self.memberships()
+        for pos, idx in enumerate(self.indexes()):
+            fips = set(self._fips[rows[offsets[pos]:offsets[pos+1]]].tolist())
+            clusters.append(alg_cluster.Cluster(
+                fips, float(self._horiz[idx]), float(self._vert[idx]),
+                int(self._population[idx]), float(self._risk[idx])))
+        return clusters
+
+    def copy(self):
+        """Return a copy of the table, no shared arrays"""
+        table = ClusterTable([], [], [], [], [], [])
+        for name, column in vars(self).items():
+            setattr(table, name, column.copy())
+        return table
+
+    def indexes(self):
+        """Slot indexes of the live clusters"""
+        return np.flatnonzero(self._alive)
+
+    def horiz_center(self, idx):
+        """Get the averged horizontal center of a cluster"""
+        return float(self._horiz[idx])
+
+    def vert_center(self, idx):
+        """Get the averaged vertical center of a cluster"""
+        return float(self._vert[idx])
+
+    def total_population(self, idx):
+        """Get the total population of a cluster"""
+        return int(self._population[idx])
+
+    def averaged_risk(self, idx):
+        """Get the averaged risk of a cluster"""
+        return float(self._risk[idx])
+
+    def fips_codes(self, idx):
+        """Get the set of FIPS codes of a cluster"""
+        root = self._root[idx]
+        if root < 0:
+            return set()
+        return set(self._fips[self._find_all() == root].tolist())
+
+    def centers(self):
+        """(horiz, vert) center arrays of the live clusters"""
+        alive = self._alive
+        return self._horiz[alive], self._vert[alive]
+
+    def distance(self, idx_u, idx_v):
+        """Euclidean distance between two clusters"""
+        return float(np.sqrt((self._vert[idx_u] - self._vert[idx_v]) ** 2
+                             + (self._horiz[idx_u] - self._horiz[idx_v]) ** 2))
+
+    def distances(self, idx):
+        """Distances from one cluster to every slot, inf for merged away slots"""
+        dists = np.sqrt((self._vert[idx] - self._vert) ** 2 + (self._horiz[idx] - self._horiz) ** 2)
+        dists[~self._alive] = float('inf')
+        return dists
+
+    def merge(self, idx_u, idx_v):
+        """
+        Merge cluster idx_v into cluster idx_u, same arithmetic
+        as alg_cluster.Cluster.merge_clusters
+
+        Note that slot idx_v is gone afterwards
+        """
+        if self._root[idx_v] < 0:
+            return self  # no counties to merge
+
+        # compute weights for averaging
+        total = self._population[idx_u] + self._population[idx_v]
+        self_weight = float(self._population[idx_u]) / total
+        other_weight = float(self._population[idx_v]) / total
+        self._population[idx_u] = total
+
+        for column in (self._vert, self._horiz, self._risk):
+            column[idx_u] = self_weight * column[idx_u] + other_weight * column[idx_v]
+
+        self._root[idx_u] = self._union(self._root[idx_u], self._root[idx_v])
+        self._alive[idx_v] = False
+        self._root[idx_v] = -1
+        return self
+
+    def merge_groups(self, labels):
+        """
+        Bulk merge, every group of live clusters sharing a label
+        collapses into the first cluster of the group
+
+        parameter
+        ---------
+        labels: one integer label per live cluster, in indexes() order
+        """
+        idxs = self.indexes()
+        labels = np.asarray(labels)
+        _, firsts, groups = np.unique(labels, return_index=True, return_inverse=True)
+        keeps = idxs[firsts]
+        num = len(keeps)
+
+        # population weighted averages of every group
+        pops = self._population[idxs].astype(np.float64)
+        totals = np.bincount(groups, weights=pops, minlength=num)
+        weights = np.where(totals > 0, totals, 1)
+        for column in (self._horiz, self._vert, self._risk):
+            sums = np.bincount(groups, weights=pops * column[idxs], minlength=num)
+            column[keeps] = np.where(totals > 0, sums / weights, column[keeps])
+        self._population[keeps] = np.rint(totals).astype(np.int64)
+
+        # hang every tree of a group under its highest ranked tree, by rank
+        # as _union does: the rank grows by one when the highest rank ties
+        has_rows = self._root[idxs] >= 0
+        roots, row_groups = self._root[idxs][has_rows], groups[has_rows]
+        ranks = self._rank[roots].astype(np.int64)
+        top_ranks = np.full(num, -1, dtype=np.int64)
+        np.maximum.at(top_ranks, row_groups, ranks)
+        is_top = ranks == top_ranks[row_groups]
+        group_roots = np.full(num, -1, dtype=np.intp)
+        used, firsts = np.unique(row_groups[is_top], return_index=True)
+        group_roots[used] = roots[is_top][firsts]
+        self._parent[roots] = group_roots[row_groups]
+        ties = np.bincount(row_groups[is_top], minlength=num) > 1
+        self._rank[group_roots[ties]] += 1
+
+        self._alive[idxs] = False
+        self._alive[keeps] = True
+        self._root[idxs] = -1
+        self._root[keeps] = group_roots
+        return self
+
+    def memberships(self):
+        """
+        County rows of the live clusters in CSR form
+
+        return
+        ------
+        (offsets, rows): rows[offsets[i]:offsets[i+1]] are the county rows
+            of the i-th live cluster, in indexes() order
+        """
+        idxs = self.indexes()
+        roots = self._find_all()
+        pos_of_root = np.full(len(roots), len(idxs), dtype=np.intp)
+        has_rows = self._root[idxs] >= 0
+        pos_of_root[self._root[idxs][has_rows]] = np.flatnonzero(has_rows)
+
+        positions = pos_of_root[roots]
+        rows = np.argsort(positions, kind='mergesort')
+        counts = np.bincount(positions, minlength=len(idxs) + 1)[:len(idxs)]
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        return offsets, rows[:offsets[-1]]
+
+    def nbytes(self):
+        """Bytes used by all the columns"""
+        return sum(column.nbytes for column in vars(self).values())
+
+    def _union(self, root_u, root_v):
+        """Link two union-find trees by rank, return the new root"""
+        if root_u < 0:
+            return root_v
+        if self._rank[root_u] < self._rank[root_v]:
+            root_u, root_v = root_v, root_u
+        self._parent[root_v] = root_u
+        if self._rank[root_u] == self._rank[root_v]:
+            self._rank[root_u] += 1
+        return root_u
+
+    def _find_all(self):
+        """Root row of every row, with full path compression"""
+        parent = self._parent
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+        self._parent = parent
+        return parent
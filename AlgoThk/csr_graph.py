@@ -0,0 +1,248 @@
+"""
+Compressed sparse row (CSR) representation of graphs
+
+The neighbors of node index i are neighbors[offsets[i]:offsets[i+1]],
+sorted, and labels[i] is the node's name in the dict of sets form used
+by graph_gen, cc_gr, graph_degree and utils. Undirected graphs store
+every edge both ways, like the dict of sets form does.
+"""
+import itertools
+import numpy as np
+import graph_degree
+
+
+class CSRGraph:
+    """
+    Graph with CSR storage
+
+    parameter
+    ---------
+    offsets: int array of size n+1, row starts into neighbors
+    neighbors: int array of node indexes
+    labels: node names, by default the node indexes
+    """
+
+    def __init__(self, offsets, neighbors, labels=None):
+        """Create a graph from its arrays"""
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        num_nodes = len(self.offsets) - 1
+        self.neighbors = np.asarray(neighbors, dtype=index_dtype(num_nodes))
+        if labels is None:
+            labels = np.arange(num_nodes)
+        self.labels = np.asarray(labels)
+
+    def __len__(self):
+        """Number of nodes"""
+        return len(self.offsets) - 1
+
+    def __repr__(self):
+        """Short description of the graph"""
+        return "CSRGraph(%d nodes, %d edges)" % (len(self), self.num_edges())
+
+    @classmethod
+    def from_edges(cls, sources, targets, num_nodes, labels=None, undirected=False):
+        """
+        Build a graph from edge arrays of node indexes
+
+        parameter
+        ---------
+        sources, targets: int arrays, edge k goes sources[k] -> targets[k]
+        num_nodes: number of nodes, indexes run from 0 to num_nodes-1
+        labels: node names, by default the node indexes
+        undirected: add every edge both ways
+
+        Repeated edges are kept once, like in a set.
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        if undirected:
+            sources, targets = np.concatenate((sources, targets)), np.concatenate((targets, sources))
+
+        # one sort by (source, target) groups the rows and drops repeats
+        keys = np.unique(sources * num_nodes + targets)
+        counts = np.bincount(keys // max(num_nodes, 1), minlength=num_nodes)
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        return cls(offsets, keys % max(num_nodes, 1), labels)
+
+    @classmethod
+    def from_dict(cls, graph):
+        """
+        Build a graph from the dict of sets form, {node: set([neigh, ...])}
+
+        Neighbors that are not keys of the dict become nodes without edges.
+        """
+        nodes = set(graph)
+        for neighs in graph.values():
+            nodes.update(neighs)
+        labels = np.array(sorted(nodes))
+
+        sources = np.array([node for node in graph for _ in graph[node]])
+        targets = np.array(list(itertools.chain.from_iterable(graph.values())))
+        if not len(sources):
+            return cls.from_edges([], [], len(labels), labels)
+        return cls.from_edges(np.searchsorted(labels, sources), np.searchsorted(labels, targets),
+                              len(labels), labels)
+
+    def to_dict(self):
+        """Convert the graph to the dict of sets form, {node: set([neigh, ...])}"""
+        labels = self.labels.tolist()
+        neighbors = self.labels[self.neighbors].tolist()
+        offsets = self.offsets.tolist()
+        return dict((labels[idx], set(neighbors[offsets[idx]:offsets[idx+1]]))
+                    for idx in range(len(labels)))
+
+    def copy(self):
+        """Return a copy of the graph, no shared arrays"""
+        return CSRGraph(self.offsets.copy(), self.neighbors.copy(), self.labels.copy())
+
+    def num_edges(self):
+        """Number of stored edges, twice the undirected edges"""
+        return len(self.neighbors)
+
+    def degrees(self):
+        """Out-degree of every node, the degree for undirected graphs"""
+        return np.diff(self.offsets)
+
+    def index(self, node):
+        """Node index of a node name"""
+        idx = int(np.searchsorted(self.labels, node))
+        if idx == len(self.labels) or self.labels[idx] != node:
+            raise KeyError(node)
+        return idx
+
+    def neighbors_of(self, idx):
+        """Neighbor indexes of node index idx"""
+        return self.neighbors[self.offsets[idx]:self.offsets[idx+1]]
+
+    def edges(self):
+        """(sources, targets) index arrays of all stored edges"""
+        return np.repeat(np.arange(len(self)), self.degrees()), self.neighbors
+
+    def nbytes(self):
+        """Bytes used by all the arrays"""
+        return self.offsets.nbytes + self.neighbors.nbytes + self.labels.nbytes
+
+
+def index_dtype(num_nodes):
+    """Smallest of int32 and int64 that holds node indexes"""
+    return np.int32 if num_nodes < 2 ** 31 else np.int64
+
+
+def _gather_neighbors(graph, nodes):
+    """Neighbor indexes of all the given node indexes, concatenated"""
+    starts = graph.offsets[nodes]
+    counts = graph.offsets[nodes+1] - starts
+    total = counts.sum()
+    if total == 0:
+        return graph.neighbors[:0]
+    # position k of the output reads neighbors[starts[row] + k - row start in the output]
+    shifts = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+    return graph.neighbors[shifts + np.arange(total)]
+
+
+def bfs_visited_indexes(graph, start):
+    """Boolean mask of the node indexes reached from node index start"""
+    visited = np.zeros(len(graph), dtype=bool)
+    visited[start] = True
+    frontier = np.array([start])
+    while len(frontier):
+        # whole frontier at once, one array step per BFS level
+        reached = np.unique(_gather_neighbors(graph, frontier))
+        frontier = reached[~visited[reached]]
+        visited[frontier] = True
+    return visited
+
+
+def bfs_visited(graph, start_node):
+    """
+    Breadth first search for the visited nodes in an undirected CSRGraph,
+    same as cc_gr.bfs_visited
+
+    return
+    ------
+    set([node1, node2, ...]): all visited nodes from the start_node
+    """
+    visited = bfs_visited_indexes(graph, graph.index(start_node))
+    return set(graph.labels[visited].tolist())
+
+
+def component_labels(graph):
+    """
+    Connected component of every node of an undirected CSRGraph
+
+    return
+    ------
+    array of the smallest node index of each node's component
+
+    method
+    ------
+    Every node points to a parent, at first itself. Each round hooks the
+    parent of every node to the smallest parent among its neighbors, then
+    jumps pointers until every node points to its root. Roots only ever
+    get smaller and stay in their component, and a round without changes
+    leaves every edge inside one root. Whole array steps, O(log n) rounds
+    in practice.
+    """
+    num_nodes = len(graph)
+    parent = np.arange(num_nodes)
+    degrees = graph.degrees()
+    has_edges = degrees > 0
+    starts = graph.offsets[:-1][has_edges]
+    if not len(starts):
+        return parent
+
+    while True:
+        # smallest parent around every node with edges
+        lowest = parent.copy()
+        lowest[has_edges] = np.minimum(parent[has_edges],
+                                       np.minimum.reduceat(parent[graph.neighbors], starts))
+        if np.array_equal(lowest, parent):
+            return parent
+
+        np.minimum.at(parent, parent, lowest)  # hook roots
+        np.minimum(parent, lowest, out=parent)
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+
+
+def cc_visited(graph):
+    """Return a list of sets of connected components in an undirected CSRGraph"""
+    if not len(graph):
+        return []
+    roots = component_labels(graph)
+    order = np.argsort(roots, kind='mergesort')
+    _, firsts = np.unique(roots[order], return_index=True)
+    return [set(members.tolist()) for members in np.split(graph.labels[order], firsts[1:])]
+
+
+def largest_cc_size(graph):
+    """Return the largest size of connected components in an undirected CSRGraph"""
+    if not len(graph):
+        return 0
+    return int(np.bincount(component_labels(graph)).max())
+
+
+def compute_in_degrees(graph):
+    """
+    Calculate the in-degree of every node of a CSRGraph
+
+    return
+    ------
+    array of in-degrees, in the order of graph.labels
+    """
+    return np.bincount(graph.neighbors, minlength=len(graph))
+
+
+def in_degree_distribution(graph):
+    """
+    Calculate the in-degree distribution of a CSRGraph,
+    same as graph_degree.in_degree_distribution
+
+    return
+    ------
+    {in_degree: # of nodes ...}: unnoramlized frequency dist
+    """
+    return graph_degree.degree_distribution(compute_in_degrees(graph))
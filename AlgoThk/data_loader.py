@@ -0,0 +1,267 @@
+"""
+Streaming loaders for the course data files
+
+The cancer risk tables are parsed a chunk of lines at a time straight
+into a numpy record array with the columns of CANCER_FIELDS, with an
+optional .npy cache next to the csv file that later loads memory-mapped.
+
+The graph files, lines of "node neighbor neighbor ...", are parsed the
+same way into the arrays of a csr_graph.CSRGraph, with an optional cache
+of .npy files named after the md5 digest of the text file.
+"""
+import os
+import hashlib
+import itertools
+import numpy as np
+import csr_graph
+
+CANCER_FIELDS = ('fips', 'horiz', 'vert', 'population', 'risk')
+
+# lines parsed at once
+CHUNK_LINES = 2 ** 16
+
+# arrays of a cached CSRGraph, one .npy file each
+GRAPH_ARRAYS = ('offsets', 'neighbors', 'labels')
+
+
+def cancer_dtype(fips_len=5):
+    """Record type of one county line"""
+    return np.dtype([('fips', 'S%d' % fips_len), ('horiz', np.float64), ('vert', np.float64),
+                     ('population', np.int64), ('risk', np.float64)])
+
+
+def iter_cancer_chunks(data_url, chunk_lines=CHUNK_LINES, fips_len=5):
+    """
+    Parse a county-based cancer risk csv file in chunks
+
+    parameter
+    ---------
+    data_url: path of the csv file, lines of fips, x, y, population, risk
+    chunk_lines: number of lines per chunk
+    fips_len: width of the fips column
+
+    return
+    ------
+    generator of record arrays, at most chunk_lines records each
+    """
+    dtype = cancer_dtype(fips_len)
+    with open(data_url) as data_file:
+        while True:
+            lines = list(itertools.islice(data_file, chunk_lines))
+            if not lines:
+                break
+            lines = [line for line in lines if line.strip()]
+            if not lines:
+                continue
+
+            # one flat token list, numpy converts each column at once
+            tokens = ','.join(lines).split(',')
+            num_fields = len(CANCER_FIELDS)
+            if len(tokens) != num_fields * len(lines):
+                raise ValueError('expected %d fields per line in %s' % (num_fields, data_url))
+
+            chunk = np.empty(len(lines), dtype=dtype)
+            chunk['fips'] = np.char.strip(np.array(tokens[0::num_fields]))
+            for col, name in enumerate(CANCER_FIELDS[1:], 1):
+                chunk[name] = np.array(tokens[col::num_fields], dtype=dtype[name])
+            yield chunk
+
+
+def load_cancer_table(data_url, cache=False, chunk_lines=CHUNK_LINES):
+    """
+    Import a table of county-based cancer risk data into a record array
+
+    parameter
+    ---------
+    data_url: path of the csv file
+    cache: keep a binary copy at data_url + '.npy', later calls
+        memory-map it as long as it is newer than the csv file
+    chunk_lines: number of lines parsed at once
+
+    return
+    ------
+    record array with the fields of CANCER_FIELDS, one record per county
+        records index like the lines of alg_project3_viz.load_data_table
+
+    rationale
+    ---------
+    A first pass only counts lines and measures the fips width, so the
+        output is allocated once, in memory or straight in the cache file,
+        and filled one chunk at a time. Peak memory is the table plus one
+        chunk, or just one chunk when caching.
+    """
+    cache_url = data_url + '.npy'
+    if cache and os.path.exists(cache_url) and os.path.getmtime(cache_url) >= os.path.getmtime(data_url):
+        return np.load(cache_url, mmap_mode='r')
+
+    num, fips_len = 0, 1
+    with open(data_url) as data_file:
+        for line in data_file:
+            if line.strip():
+                num += 1
+                fips_len = max(fips_len, line.find(','))
+
+    dtype = cancer_dtype(fips_len)
+    tmp_url = cache_url + '.tmp'
+    if cache:
+        table = np.lib.format.open_memmap(tmp_url, mode='w+', dtype=dtype, shape=(num,))
+    else:
+        table = np.empty(num, dtype=dtype)
+
+    try:
+        start = 0
+        for chunk in iter_cancer_chunks(data_url, chunk_lines, fips_len):
+            table[start:start+len(chunk)] = chunk
+            start += len(chunk)
+    except Exception:
+        if cache:
+            # a failed parse leaves no cache file
+            del table
+            os.remove(tmp_url)
+        raise
+
+    if cache:
+        table.flush()
+        del table
+        # fill then rename, an interrupted load leaves no cache file
+        if os.path.exists(cache_url):
+            os.remove(cache_url)
+        os.rename(tmp_url, cache_url)
+        return np.load(cache_url, mmap_mode='r')
+    return table
+
+
+def table_rows(table):
+    """
+    Convert a record array to the list of lists of
+    alg_project3_viz.load_data_table: [fips, x, y, population, risk]
+    """
+    return [list(record) for record in table.tolist()]
+
+
+def iter_graph_chunks(data_url, chunk_lines=CHUNK_LINES):
+    """
+    Parse a graph file of adjacency lines in chunks
+
+    parameter
+    ---------
+    data_url: path of the text file, lines of node followed by its neighbors
+    chunk_lines: number of lines per chunk
+
+    return
+    ------
+    generator of (nodes, counts, neighbors) int arrays, at most chunk_lines
+        nodes each, the neighbors of nodes[i] are counts[i] items of
+        neighbors, in the order of the file
+    """
+    with open(data_url) as data_file:
+        while True:
+            lines = list(itertools.islice(data_file, chunk_lines))
+            if not lines:
+                break
+            sizes = np.array([len(line.split()) for line in lines], dtype=np.int64)
+            sizes = sizes[sizes > 0]
+            if not len(sizes):
+                continue
+
+            # numpy parses the whole chunk, the first token of each line is its node
+            tokens = np.fromstring(' '.join(lines), dtype=np.int64, sep=' ')
+            if len(tokens) != sizes.sum():
+                raise ValueError('expected integer node names in %s' % data_url)
+            starts = np.cumsum(sizes) - sizes
+            is_neighbor = np.ones(len(tokens), dtype=bool)
+            is_neighbor[starts] = False
+            yield tokens[starts], sizes - 1, tokens[is_neighbor]
+
+
+def file_digest(data_url, block_size=2 ** 20):
+    """md5 hex digest of a file, read one block at a time"""
+    digest = hashlib.md5()
+    with open(data_url, 'rb') as data_file:
+        for block in iter(lambda: data_file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def graph_cache_urls(data_url, cache_dir=None):
+    """
+    Paths of the cache files of a graph file, one per name of GRAPH_ARRAYS
+
+    The names hold the md5 digest of the graph file, so an edited file
+        never reads the cache of its older contents.
+    """
+    if cache_dir is None:
+        cache_dir = os.path.dirname(os.path.abspath(data_url))
+    prefix = os.path.join(cache_dir, '%s.%s' % (os.path.basename(data_url), file_digest(data_url)))
+    return dict((name, '%s.%s.npy' % (prefix, name)) for name in GRAPH_ARRAYS)
+
+
+def load_graph(data_url, cache=False, cache_dir=None, chunk_lines=CHUNK_LINES):
+    """
+    Import a graph file of adjacency lines into a CSRGraph
+
+    parameter
+    ---------
+    data_url: path of the text file, lines of node followed by its neighbors,
+        like data/alg_phys-cite.txt
+    cache: keep the arrays of the graph in .npy files, later calls
+        memory-map them as long as the text file keeps the same contents
+    cache_dir: directory of the cache files, by default the one of data_url
+    chunk_lines: number of lines parsed at once
+
+    return
+    ------
+    csr_graph.CSRGraph, the same graph as CSRGraph.from_dict of the dict of
+        sets read by citation_graph.ipynb, neighbors that have no line of
+        their own become nodes without edges
+
+    rationale
+    ---------
+    A first pass only counts lines and neighbors, so the node and edge
+        arrays are allocated once and filled one chunk at a time, without
+        a dict of sets or a list of every token. Parsing holds the edge
+        arrays plus one chunk. Building the CSRGraph then takes a few
+        more int64 arrays of the edge list size, for np.union1d of the
+        node names and for the sorted edge keys of CSRGraph.from_edges,
+        so peak memory is a small multiple of the edge arrays.
+    """
+    if cache:
+        cache_urls = graph_cache_urls(data_url, cache_dir)
+        if all(os.path.exists(url) for url in cache_urls.values()):
+            return csr_graph.CSRGraph(*[np.load(cache_urls[name], mmap_mode='r') for name in GRAPH_ARRAYS])
+
+    num_nodes, num_edges = 0, 0
+    with open(data_url) as data_file:
+        for line in data_file:
+            num_tokens = len(line.split())
+            if num_tokens:
+                num_nodes += 1
+                num_edges += num_tokens - 1
+
+    nodes = np.empty(num_nodes, dtype=np.int64)
+    sources = np.empty(num_edges, dtype=np.int64)
+    targets = np.empty(num_edges, dtype=np.int64)
+    node_start, edge_start = 0, 0
+    for chunk_nodes, counts, neighbors in iter_graph_chunks(data_url, chunk_lines):
+        nodes[node_start:node_start+len(chunk_nodes)] = chunk_nodes
+        sources[edge_start:edge_start+len(neighbors)] = np.repeat(chunk_nodes, counts)
+        targets[edge_start:edge_start+len(neighbors)] = neighbors
+        node_start += len(chunk_nodes)
+        edge_start += len(neighbors)
+
+    # node names to indexes, in place
+    labels = np.union1d(nodes, targets)
+    del nodes
+    sources[:] = np.searchsorted(labels, sources)
+    targets[:] = np.searchsorted(labels, targets)
+    graph = csr_graph.CSRGraph.from_edges(sources, targets, len(labels), labels)
+
+    if cache:
+        for name in GRAPH_ARRAYS:
+            # write then rename, an interrupted save leaves no cache file
+            tmp_url = cache_urls[name] + '.tmp'
+            with open(tmp_url, 'wb') as cache_file:
+                np.save(cache_file, getattr(graph, name))
+            os.rename(tmp_url, cache_urls[name])
+        return csr_graph.CSRGraph(*[np.load(cache_urls[name], mmap_mode='r') for name in GRAPH_ARRAYS])
+    return graph
@@ -8,6 +8,8 @@ in-degree: # of edges to node[i]
 out-degree: # of edges out of node[i]
 """
 import random
+import itertools
+import numpy as np
 
 # adjacent list implementation
 # of directed graphs
@@ -94,3 +96,85 @@ def in_degree_distribution(graph):
         dist[in_degree] = dist.get(in_degree, 0) + 1
 
     return dist
+
+
+def edge_targets(graph):
+    """All edge targets of a graph as one flat array"""
+    targets = list(itertools.chain.from_iterable(graph.values()))
+    return np.array(targets) if targets else np.zeros(0, dtype=np.int64)
+
+
+def degree_distribution(degrees):
+    """
+    Frequency distribution of an array of degrees
+
+    return
+    ------
+    {degree: # of nodes ...}: unnoramlized frequency dist
+    """
+    dist = np.bincount(np.asarray(degrees, dtype=np.int64))
+    return dict((deg, int(count)) for deg, count in enumerate(dist.tolist()) if count)
+
+
+def fast_in_degree_distribution(graph):
+    """
+    Vectorized in_degree_distribution, same output
+
+    method
+    ------
+    Flatten the edge targets into one array, number the distinct targets,
+    one bincount gives their in-degrees and a second one the distribution.
+    Nodes nobody points to add to the count of in-degree 0.
+    """
+    targets = edge_targets(graph)
+    uniques, codes = np.unique(targets, return_inverse=True)
+    in_degrees = np.bincount(codes)
+
+    num_nodes = len(np.union1d(np.array(list(graph)), uniques))
+    dist = degree_distribution(in_degrees)
+    if num_nodes > len(in_degrees):
+        dist[0] = num_nodes - len(in_degrees)
+    return dist
+
+
+def normalized_distribution(dist):
+    """
+    Normalize a frequency distribution to a PMF
+
+    return
+    ------
+    {degree: fraction of nodes ...}
+    """
+    total = float(sum(dist.values()))
+    return dict((deg, count / total) for deg, count in dist.items())
+
+
+def log_binned_distribution(dist, bins_per_decade=10):
+    """
+    Log-binned PMF of a degree distribution for log/log plots,
+    degree 0 is left out
+
+    parameter
+    ---------
+    dist: {degree: # of nodes ...}
+    bins_per_decade: number of bins between powers of ten
+
+    return
+    ------
+    (centers, density): arrays, the geometric center of every non empty bin
+        and the fraction of nodes in the bin per unit of degree
+    """
+    degrees = np.array(sorted(deg for deg in dist if deg > 0))
+    if not len(degrees):
+        return np.zeros(0), np.zeros(0)
+    counts = np.array([dist[deg] for deg in degrees], dtype=np.float64)
+
+    num_bins = max(1, int(np.ceil(np.log10(degrees[-1] + 1) * bins_per_decade)))
+    edges = np.logspace(0, np.log10(degrees[-1] + 1), num_bins + 1)
+    bins = np.clip(np.searchsorted(edges, degrees, side='right') - 1, 0, num_bins - 1)
+    mass = np.bincount(bins, weights=counts, minlength=num_bins) / float(sum(dist.values()))
+
+    used = mass > 0
+    widths = np.diff(edges)
+    centers = np.sqrt(edges[:-1] * edges[1:])
+    return centers[used], mass[used] / widths[used]
@@ -3,6 +3,14 @@ Module for generating all kind of graphs
 """
 
 import random
+import numpy as np
+import csr_graph
+
+# largest block of new nodes drawn at once by fast_algo_dpa and fast_algo_upa
+MAX_BLOCK_NODES = 2 ** 12
+
+# largest batch of edge skips drawn at once by fast_algo_er
+MAX_BATCH_EDGES = 2 ** 20
 
 
 def make_complete_graph(num_nodes):
@@ -56,6 +64,73 @@ def algo_er(num_nodes, prob):
     return graph
 
 
+def _triangle_pairs(indexes):
+    """
+    Node pairs of edge indexes in the lower triangle of the adjacency
+    matrix, index row*(row-1)/2 + col for col < row
+
+    return
+    ------
+    (rows, cols): int arrays
+    """
+    rows = np.floor((1 + np.sqrt(1 + 8.0 * indexes)) / 2).astype(np.int64)
+    # float rounding puts a row off by one at most
+    rows -= rows * (rows - 1) // 2 > indexes
+    rows += (rows + 1) * rows // 2 <= indexes
+    return rows, indexes - rows * (rows - 1) // 2
+
+
+def fast_algo_er(num_nodes, prob, seed=None, as_dict=False):
+    """
+    ER undirected graph like algo_er, in O(n + m) time
+
+    parameter
+    ---------
+    num_nodes: size of nodes in the graph
+    prob: probability to create an edge between two nodes
+    seed: random seed, the same seed gives the same graph
+    as_dict: return the dict of sets of algo_er instead of a CSRGraph
+
+    return
+    ------
+    csr_graph.CSRGraph, or {node1: set([neigh1, neigh2 ...]), ...}
+        if as_dict, edges of the CSRGraph are in graph.edges()
+
+    method
+    ------
+    Batagelj and Brandes: the gaps between edges in the list of the
+        n(n-1)/2 node pairs are geometric, log(u) / log(1-p) pairs, so
+        only the edges are drawn. The gaps come in numpy batches, their
+        cumulative sum gives the pair indexes and _triangle_pairs the
+        nodes.
+    """
+    num_nodes = max(num_nodes, 0)
+    num_pairs = num_nodes * (num_nodes - 1) // 2
+    if prob >= 1:
+        indexes = np.arange(num_pairs, dtype=np.int64)
+    elif prob <= 0 or num_pairs == 0:
+        indexes = np.zeros(0, dtype=np.int64)
+    else:
+        rng = np.random.RandomState(seed)
+        log_keep = np.log1p(-prob)
+        expected = num_pairs * prob
+        batch = int(min(expected + 4 * np.sqrt(expected) + 16, MAX_BATCH_EDGES))
+        batches = []
+        last = -1
+        while last < num_pairs:
+            # 1 - random_sample is in (0, 1], the log stays finite
+            gaps = np.floor(np.log(1 - rng.random_sample(batch)) / log_keep)
+            gaps = np.minimum(gaps, num_pairs).astype(np.int64)
+            indexes = last + np.cumsum(gaps + 1)
+            batches.append(indexes[indexes < num_pairs])
+            last = indexes[-1]
+        indexes = np.concatenate(batches)
+
+    rows, cols = _triangle_pairs(indexes)
+    graph = csr_graph.CSRGraph.from_edges(rows, cols, num_nodes, undirected=True)
+    return graph.to_dict() if as_dict else graph
+
+
 class AlgoDPA:
     """
     DPA Graph Generator
@@ -144,3 +219,213 @@ def algo_upa(num_nodes, init_nodes):
     """Adjacent list implementation of UPA undirected graph algorithm"""
     dpa = AlgoUPA(num_nodes, init_nodes)
     return dpa.generate_graph()
+
+
+def _later_copies(rows):
+    """Mask of the draws of every row that repeat an earlier draw of the row"""
+    order = np.argsort(rows, axis=1, kind='mergesort')
+    ordered = np.take_along_axis(rows, order, axis=1)
+    later = np.zeros(order.shape, dtype=bool)
+    later[:, 1:] = ordered[:, 1:] == ordered[:, :-1]
+    repeats = np.zeros(order.shape, dtype=bool)
+    np.put_along_axis(repeats, order, later, axis=1)
+    return repeats
+
+
+def _draw_block(weights, base, first_node, num, num_init, num_self, undirected, rng):
+    """
+    Draw the neighbors of a block of num new nodes, see _attach_nodes
+
+    parameter
+    ---------
+    weights: the weighted choice list, filled up to base, holes are -1
+    base: start of the block's segments in weights
+    first_node: the first new node of the block
+    num_init: draws per node
+    num_self: copies of a node at the start of its segment
+
+    return
+    ------
+    (rows, repeats, sizes): draws of every node, the mask of draws that
+        repeat an earlier draw of the node, and the number of distinct draws
+
+    The invariant: a draw is only settled on a slot that holds a node,
+        so every settled draw is a uniform pick among the node copies
+        of the list before its node. A slot of an older block holds its
+        value or a hole. A slot of this block is known once the row of
+        its segment is settled: a copy of the node, a hole past the used
+        UPA copies, or the draw of that row, a hole if it repeats. A draw
+        on a hole is drawn again over the same list size. Segments only
+        refer to earlier rows, so every round settles at least a row.
+    """
+    seg_len = num_self + num_init
+    lengths = np.repeat(base + seg_len * np.arange(num), num_init)
+    slots = (rng.random_sample(num * num_init) * lengths).astype(np.int64)
+    draws = np.full(num * num_init, -1, dtype=np.int64)
+    rows = draws.reshape(num, num_init)
+    repeats = np.zeros((num, num_init), dtype=bool)
+    sizes = np.zeros(num, dtype=np.int64)
+    done = np.zeros(num, dtype=bool)
+
+    pending = np.arange(num * num_init)
+    while len(pending):
+        ref = slots[pending]
+        value = np.full(len(pending), -1, dtype=np.int64)
+        hole = np.zeros(len(pending), dtype=bool)
+
+        # slots of older blocks
+        old = ref < base
+        value[old] = weights[ref[old]]
+        hole[old] = value[old] < 0
+
+        # slots of this block whose row is settled
+        seg, col = np.divmod(ref - base, seg_len)
+        ready = ~old & done[np.where(old, 0, seg)]
+        is_self = ready & (col < num_self)
+        value[is_self] = first_node + seg[is_self]
+        hole[is_self] = col[is_self] >= 1 + (sizes[seg[is_self]] if undirected else 0)
+        is_draw = ready & ~is_self
+        draw_at = seg[is_draw] * num_init + col[is_draw] - num_self
+        value[is_draw] = draws[draw_at]
+        hole[is_draw] = repeats.ravel()[draw_at]
+
+        redraw = pending[hole]
+        slots[redraw] = (rng.random_sample(len(redraw)) * lengths[redraw]).astype(np.int64)
+        found = (old | ready) & ~hole
+        draws[pending[found]] = value[found]
+        pending = pending[~found]
+
+        now_done = ~done & (rows >= 0).all(axis=1)
+        if now_done.any():
+            repeats[now_done] = _later_copies(rows[now_done])
+            sizes[now_done] = num_init - repeats[now_done].sum(axis=1)
+            done |= now_done
+    return rows, repeats, sizes
+
+
+def _block_segments(rows, repeats, sizes, first_node, num_self, undirected):
+    """
+    Segments of a block in the weighted choice list, holes are -1
+
+    Every row is num_self copies of its node, only 1 + sizes of them
+        used for UPA, followed by its draws with repeats as holes.
+    """
+    num = len(rows)
+    segments = np.empty((num, num_self + rows.shape[1]), dtype=np.int64)
+    segments[:, :num_self] = (first_node + np.arange(num))[:, np.newaxis]
+    if undirected:
+        segments[:, :num_self][np.arange(num_self) >= 1 + sizes[:, np.newaxis]] = -1
+    segments[:, num_self:] = np.where(repeats, -1, rows)
+    return segments
+
+
+def _attach_nodes(num_nodes, init_nodes, undirected, seed):
+    """
+    Draw the neighbors of every new node of a DPA or UPA graph
+
+    return
+    ------
+    (counts, chosen): int arrays, new node init_nodes + i has the
+        counts[i] sorted neighbors that come next in chosen
+
+    method
+    ------
+    The weighted choice list is one preallocated array of its largest
+        size. Every new node owns a segment of fixed length, itself
+        (1 copy, 1 + init_nodes copies for UPA) followed by its draws,
+        and the slots of repeated draws (and of unused UPA copies) are
+        holes. A draw picks a uniform slot of the list and is drawn again
+        on a hole, so it picks a uniform node copy as random.choice does.
+        With fixed segments every node of a block knows the list size
+        before it, so a whole block is drawn at once by _draw_block.
+    """
+    num_init = init_nodes
+    num_new = max(num_nodes - num_init, 0)
+    num_self = num_init + 1 if undirected else 1  # copies of a new node in its segment
+    seg_len = num_self + num_init
+    dtype = csr_graph.index_dtype(max(num_nodes, num_init))
+
+    # the complete graph weighs every initial node init_nodes times
+    weights = np.empty(num_init * num_init + num_new * seg_len, dtype=dtype)
+    weights[:num_init*num_init] = np.repeat(np.arange(num_init), num_init)
+
+    rng = np.random.RandomState(seed)
+    counts = np.empty(num_new, dtype=np.int64)
+    chosen = np.empty(num_new * num_init, dtype=dtype)
+    num_chosen = 0
+    new = 0
+    while new < num_new:
+        # blocks grow with the graph, so few draws land in their own block
+        num = min(max(1, (num_init + new) // 4), MAX_BLOCK_NODES, num_new - new)
+        base = num_init * num_init + new * seg_len
+        first_node = num_init + new
+        rows, repeats, sizes = _draw_block(weights, base, first_node, num, num_init, num_self, undirected, rng)
+        segments = _block_segments(rows, repeats, sizes, first_node, num_self, undirected)
+        weights[base:base+num*seg_len] = segments.ravel()
+
+        # distinct draws of every row, sorted
+        ordered = np.sort(rows, axis=1)
+        unique = np.ones(ordered.shape, dtype=bool)
+        unique[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+        counts[new:new+num] = sizes
+        chosen[num_chosen:num_chosen+sizes.sum()] = ordered[unique]
+        num_chosen += sizes.sum()
+        new += num
+    return counts, chosen[:num_chosen]
+
+
+def _complete_edges(num_nodes):
+    """(sources, targets) arrays of all the edges of make_complete_graph"""
+    sources = np.repeat(np.arange(num_nodes), max(num_nodes - 1, 0))
+    targets = np.tile(np.arange(num_nodes), num_nodes)
+    targets = targets[targets != np.repeat(np.arange(num_nodes), num_nodes)]
+    return sources, targets
+
+
+def fast_algo_dpa(num_nodes, init_nodes, seed=None, as_dict=False):
+    """
+    DPA digraph like algo_dpa, with numpy draws into a preallocated
+    weighted choice array
+
+    parameter
+    ---------
+    num_nodes: the desired network size in nodes
+    init_nodes: initial nodes size that are fully connected,
+        and number of draws of every new node
+    seed: random seed, the same seed gives the same graph
+    as_dict: return the dict of sets of algo_dpa instead of a CSRGraph
+
+    return
+    ------
+    csr_graph.CSRGraph, or {node1: set([neigh1, neigh2 ...]), ...}
+        if as_dict, edges of the CSRGraph are in graph.edges()
+    """
+    counts, chosen = _attach_nodes(num_nodes, init_nodes, False, seed)
+    # rows come in node order, initial nodes first, no sort needed
+    row_sizes = np.concatenate((np.repeat(max(init_nodes - 1, 0), init_nodes), counts))
+    offsets = np.concatenate(([0], np.cumsum(row_sizes)))
+    graph = csr_graph.CSRGraph(offsets, np.concatenate((_complete_edges(init_nodes)[1], chosen)))
+    return graph.to_dict() if as_dict else graph
+
+
+def fast_algo_upa(num_nodes, init_nodes, seed=None, as_dict=False):
+    """
+    UPA undirected graph like algo_upa, with numpy draws into a
+    preallocated weighted choice array
+
+    parameter
+    ---------
+    see fast_algo_dpa
+
+    return
+    ------
+    csr_graph.CSRGraph, or {node1: set([neigh1, neigh2 ...]), ...}
+        if as_dict
+    """
+    counts, chosen = _attach_nodes(num_nodes, init_nodes, True, seed)
+    num = max(num_nodes, init_nodes)
+    init_sources, init_targets = _complete_edges(init_nodes)
+    sources = np.concatenate((init_sources, np.repeat(np.arange(init_nodes, num), counts)))
+    targets = np.concatenate((init_targets, chosen))
+    graph = csr_graph.CSRGraph.from_edges(sources, targets, num, undirected=True)
+    return graph.to_dict() if as_dict else graph
@@ -3,12 +3,34 @@ Module for finding the closest pair of two cluster objects
 within a 2-D plane and Clustering algorithms
 1. Brutal Force pair finding            O(n**2)
 2. Divide-and-conquer pair finding      O(nlogn)
-3. Hierarchical Clustering              Q(n**2 logn)
-4. K-Means Clustering                   O(qnk)
+3. Array-backed closest pair finding    O(nlogn)
+4. Hierarchical Clustering              Q(n**2 logn)
+5. Priority queue Hierarchical          O(n**2) in the usual case
+6. K-Means Clustering                   O(qnk)
+7. Vectorized K-Means Clustering        O(qnk)
+8. Mini-batch K-Means Clustering        O(qnk), memory O(batch + k)
 """
 # %%
+import heapq
+import functools
+import numpy as np
 import alg_cluster
 
+# subproblem size solved by a vectorized brute force
+# in the array-backed closest pair recursion
+_LEAF_SIZE = 64
+
+# number of point to center distances held in memory at once
+# by the vectorized k-means assignment
+_CHUNK_CELLS = 2 ** 18
+
+# relative slack on the triangle inequality bounds, so that
+# rounding never lets a bound skip a point it should not
+_BOUND_SLACK = 1e-9
+
+# records per batch of the mini-batch k-means
+_BATCH_SIZE = 2 ** 16
+
 
 def slow_closest_pair(clusters):
     """
@@ -130,6 +152,124 @@ def closest_pair_strip(clusters, mid, delta):
     return tuple([min_dist] + sorted((min_u, min_v)))
 
 
+def array_closest_pair(clusters):
+    """
+    Array-backed closest pair finding among all given clusters
+    in (x, y) 2-D plane, see closest_pair_arrays
+
+    parameter
+    ---------
+    clusters: list of unique set of clusters in 2-D plane
+            no presorting needed
+
+    return
+    ------
+    mininum euclidian distance, cluster1 index, cluster2 index
+        i1 < i2
+    """
+    horiz = [cluster.horiz_center() for cluster in clusters]
+    vert = [cluster.vert_center() for cluster in clusters]
+    return closest_pair_arrays(horiz, vert)
+
+
+def closest_pair_arrays(horiz, vert):
+    """
+    Divide and Conquer closest pair finding on contiguous coordinate arrays
+
+    parameter
+    ---------
+    horiz: array like, x-coordinates of the points
+    vert: array like, y-coordinates of the points
+
+    return
+    ------
+    mininum euclidian distance, point1 index, point2 index
+        i1 < i2
+
+    rationale
+    ---------
+    The points are sorted once by x and once by y. Each subproblem is
+        a range of the x-ordering plus its own y-ordered index array,
+        which is split stably with a mask on the x-rank. So there are
+        no list slices or .index lookups, the indexes always refer
+        to the original positions. Small subproblems and the strip
+        are checked with whole-array operations.
+    """
+    horiz = np.ascontiguousarray(horiz, dtype=np.float64)
+    vert = np.ascontiguousarray(vert, dtype=np.float64)
+    num = len(horiz)
+    if num < 2:
+        return (float('inf'), -1, -1)
+
+    order_x = np.lexsort((vert, horiz))
+    rank_x = np.empty(num, dtype=np.intp)
+    rank_x[order_x] = np.arange(num)
+    order_y = np.lexsort((horiz, vert))
+
+    min_dist, idx_u, idx_v = _closest_pair_arrays(horiz, vert, order_x, rank_x, order_y, 0, num)
+
+    # sort two index
+    return tuple([float(min_dist)] + sorted((int(idx_u), int(idx_v))))
+
+
+def _closest_pair_arrays(horiz, vert, order_x, rank_x, order_y, low, high):
+    """
+    Recursion of the array-backed closest pair finding
+
+    parameter
+    ---------
+    horiz, vert: coordinate arrays of all points
+    order_x: all point indexes sorted by x-coordinate
+    rank_x: position of each point in order_x
+    order_y: indexes of this subproblem's points, sorted by y-coordinate
+    low, high: the subproblem is order_x[low:high]
+    """
+    if high - low <= _LEAF_SIZE:  # base case, use brutal force
+        return _brute_closest_pair(horiz, vert, order_x[low:high])
+
+    # split down to two subproblems, both keep the y ordering
+    mid = (low + high) // 2
+    in_left = rank_x[order_y] < mid
+    res_l = _closest_pair_arrays(horiz, vert, order_x, rank_x, order_y[in_left], low, mid)
+    res_r = _closest_pair_arrays(horiz, vert, order_x, rank_x, order_y[~in_left], mid, high)
+    min_res = res_l if res_l[0] < res_r[0] else res_r
+
+    # check on middle strip split point
+    mid_x = (horiz[order_x[mid-1]] + horiz[order_x[mid]]) / 2.0
+    strip = order_y[np.abs(horiz[order_y] - mid_x) < min_res[0]]
+    res_s = _strip_closest_pair(horiz, vert, strip)
+
+    if res_s[0] < min_res[0]:
+        min_res = res_s
+    return min_res
+
+
+def _brute_closest_pair(horiz, vert, idxs):
+    """Vectorized brutal force closest pair among the given point indexes"""
+    num = len(idxs)
+    pts_x, pts_y = horiz[idxs], vert[idxs]
+    rows, cols = np.triu_indices(num, 1)
+    dists = np.sqrt((pts_y[rows] - pts_y[cols]) ** 2 + (pts_x[rows] - pts_x[cols]) ** 2)
+    best = np.argmin(dists)
+    return dists[best], idxs[rows[best]], idxs[cols[best]]
+
+
+def _strip_closest_pair(horiz, vert, strip):
+    """
+    Vectorized strip checking, strip holds point indexes sorted by y-coordinate
+    Compares every point with its next 7 points, one shift at a time
+    """
+    min_res = (float('inf'), -1, -1)
+    num = len(strip)
+    pts_x, pts_y = horiz[strip], vert[strip]
+    for shift in range(1, min(8, num)):
+        dists = np.sqrt((pts_y[shift:] - pts_y[:-shift]) ** 2 + (pts_x[shift:] - pts_x[:-shift]) ** 2)
+        best = np.argmin(dists)
+        if dists[best] < min_res[0]:
+            min_res = (dists[best], strip[best], strip[best+shift])
+    return min_res
+
+
 def create_dummy_clusters(points=None):
     """Return a list of dummy clusters for testing"""
     clusters = []
@@ -162,6 +302,102 @@ def hierarchical_clustering(clusters, num_k):
     return clusters
 
 
+def fast_hierarchical_clustering(clusters, num_k):
+    """
+    Hierarchical Clustering driven by a priority queue of nearest neighbors
+    Gives the same clusters as hierarchical_clustering, and the same
+    inplace mutation of the given list
+
+    return
+    ------
+    a list of unique clusters objects after clustering
+    """
+    removed = set()
+    for _, idx_v, _ in _centroid_merges(clusters, num_k):
+        removed.add(idx_v)
+
+    clusters[:] = [cluster for idx, cluster in enumerate(clusters) if idx not in removed]
+    clusters.sort(key=lambda x: x.horiz_center())
+    return clusters
+
+
+def _centroid_merges(clusters, num_k):
+    """
+    Generator of the hierarchical clustering merges, closest pair first
+    until num_k clusters are left
+
+    yield
+    -----
+    (idx_u, idx_v, dist): clusters[idx_v] has just been merged into clusters[idx_u]
+
+    rationale
+    ---------
+    Every live cluster keeps its nearest neighbor and distance, and pushes
+        them onto a heap. The heap top is then the closest pair. A merge
+        only moves the center of the merged cluster, so only the clusters
+        that pointed at the two merged ones are rescanned, everyone else
+        checks the one new distance. Outdated heap entries are skipped
+        when they are popped instead of being removed.
+    """
+    num = len(clusters)
+    if num <= num_k:
+        return
+
+    horiz = np.array([cluster.horiz_center() for cluster in clusters], dtype=np.float64)
+    vert = np.array([cluster.vert_center() for cluster in clusters], dtype=np.float64)
+    alive = np.ones(num, dtype=bool)
+    nn_idx = np.empty(num, dtype=np.intp)
+    nn_dist = np.empty(num, dtype=np.float64)
+
+    def distances(idx):
+        """distances from one cluster to all live clusters, inf for the rest"""
+        dists = np.sqrt((vert[idx] - vert) ** 2 + (horiz[idx] - horiz) ** 2)
+        dists[~alive] = float('inf')
+        dists[idx] = float('inf')
+        return dists
+
+    heap = []
+    def rescan(idx):
+        """find the nearest neighbor of one cluster from scratch"""
+        dists = distances(idx)
+        nn_idx[idx] = np.argmin(dists)
+        nn_dist[idx] = dists[nn_idx[idx]]
+        heapq.heappush(heap, (nn_dist[idx], idx, nn_idx[idx]))
+
+    for idx in range(num):
+        rescan(idx)
+
+    num_alive = num
+    while num_alive > num_k:
+        dist, idx_i, idx_j = heapq.heappop(heap)
+        if not (alive[idx_i] and alive[idx_j] and nn_idx[idx_i] == idx_j and nn_dist[idx_i] == dist):
+            continue  # outdated entry
+
+        # merge into the one on the left, as hierarchical_clustering does
+        idx_u, idx_v = sorted((int(idx_i), int(idx_j)), key=lambda idx: (horiz[idx], idx))
+        cluster = clusters[idx_u].merge_clusters(clusters[idx_v])
+        horiz[idx_u], vert[idx_u] = cluster.horiz_center(), cluster.vert_center()
+        alive[idx_v] = False
+        num_alive -= 1
+
+        # neighbors of the merged pair may be further away now
+        stale = np.flatnonzero(alive & ((nn_idx == idx_u) | (nn_idx == idx_v)))
+        for idx in stale:
+            rescan(idx)
+        if idx_u not in stale:
+            rescan(idx_u)
+
+        # the new center may be the closest one for anybody else
+        dists = distances(idx_u)
+        closer = np.flatnonzero(dists < nn_dist)
+        nn_idx[closer] = idx_u
+        nn_dist[closer] = dists[closer]
+        for idx in closer:
+            heapq.heappush(heap, (nn_dist[idx], idx, idx_u))
+
+        yield idx_u, idx_v, dist
+
+
 def kmeans_clustering(clusters, num_k, num_iter):
     """
     K-means Clustering
@@ -209,7 +445,358 @@ def kmeans_clustering(clusters, num_k, num_iter):
     return old_ks
 
 
-def compute_distortion(clusters, data_table):
+def fast_kmeans_clustering(clusters, num_k, num_iter, assign='brute', seed=None):
+    """
+    Vectorized K-means Clustering
+    Same procedure and initial centers as kmeans_clustering, but
+    positions, populations and risks live in arrays during iterations
+
+    parameter
+    ---------
+    clusters: 'n', list of clusters to be used to find the kmeans
+    num_k: 'k', number of desired k-mean clusters
+    num_iter: 'q', number of iterations to run
+    assign: how points find their nearest center
+        'brute', all point to center distances every iteration
+        'hamerly', triangle inequality bounds skip most of them, for large k
+    seed: None starts from the most populous clusters as kmeans_clustering does,
+        otherwise from num_k random clusters drawn with this seed, for restarts
+
+    return
+    ------
+    a list of unique clusters objects after clustering
+    """
+    _check_assign(assign)
+
+    # no need to run
+    num = len(clusters)
+    if num <= num_k or num_iter < 1:
+        return clusters
+
+    horiz = np.array([cluster.horiz_center() for cluster in clusters], dtype=np.float64)
+    vert = np.array([cluster.vert_center() for cluster in clusters], dtype=np.float64)
+    pops = np.array([cluster.total_population() for cluster in clusters], dtype=np.float64)
+    risks = np.array([cluster.averaged_risk() for cluster in clusters], dtype=np.float64)
+
+    # init centers by the largest population, stable like list.sort
+    if seed is None:
+        inits = np.argsort(pops, kind='mergesort')[-num_k:]
+    else:
+        inits = np.random.RandomState(seed).choice(num, num_k, replace=False)
+    labels, ctr_x, ctr_y = _kmeans_arrays(horiz, vert, pops, horiz[inits], vert[inits], num_iter, assign)
+
+    # turn the final assignment back to clusters
+    ctr_pops = np.bincount(labels, weights=pops, minlength=num_k)
+    ctr_risks = np.bincount(labels, weights=pops * risks, minlength=num_k)
+    members = np.split(np.argsort(labels, kind='mergesort'), np.cumsum(np.bincount(labels, minlength=num_k))[:-1])
+
+    kmeans = []
+    for idx_k in range(num_k):
+        fips = set()
+        for idx in members[idx_k]:
+            fips.update(clusters[idx].fips_codes())
+        pop = int(ctr_pops[idx_k])
+        risk = ctr_risks[idx_k] / ctr_pops[idx_k] if pop else 0
+        kmeans.append(alg_cluster.Cluster(fips, ctr_x[idx_k], ctr_y[idx_k], pop, risk))
+    return kmeans
+
+
+def _check_assign(assign):
+    """Raise ValueError for an unknown assign method of fast_kmeans_clustering"""
+    if assign not in ('brute', 'hamerly'):
+        raise ValueError('assign must be brute or hamerly, got %r' % assign)
+
+
+def _kmeans_arrays(horiz, vert, weights, ctr_x, ctr_y, num_iter, assign='brute'):
+    """
+    Weighted k-means iterations on coordinate arrays
+
+    parameter
+    ---------
+    horiz, vert: coordinates of the points
+    weights: weight, population of each point
+    ctr_x, ctr_y: initial k centers
+    num_iter: number of iterations to run
+    assign: 'brute' or 'hamerly', see fast_kmeans_clustering
+
+    return
+    ------
+    (labels, ctr_x, ctr_y): last assignment of every point and its centers
+        a center without points stays where it was
+    """
+    _check_assign(assign)
+    if assign == 'brute':
+        nearest = functools.partial(_nearest_centers, horiz, vert)
+    else:
+        nearest = _HamerlyBounds(horiz, vert).assign
+
+    num_k = len(ctr_x)
+    for _ in range(num_iter):
+        labels = nearest(ctr_x, ctr_y)
+
+        # population weighted mean of every group
+        totals = np.bincount(labels, weights=weights, minlength=num_k)
+        sum_x = np.bincount(labels, weights=weights * horiz, minlength=num_k)
+        sum_y = np.bincount(labels, weights=weights * vert, minlength=num_k)
+        has_points = totals > 0
+        ctr_x = np.where(has_points, sum_x / np.where(has_points, totals, 1), ctr_x)
+        ctr_y = np.where(has_points, sum_y / np.where(has_points, totals, 1), ctr_y)
+
+    return labels, ctr_x, ctr_y
+
+
+def _squared_distances(horiz, vert, ctr_x, ctr_y):
+    """Matrix of squared distances from every point to every center"""
+    dists = np.subtract.outer(vert, ctr_y)
+    dists *= dists
+    diff_x = np.subtract.outer(horiz, ctr_x)
+    diff_x *= diff_x
+    dists += diff_x
+    return dists
+
+
+def _nearest_centers(horiz, vert, ctr_x, ctr_y):
+    """
+    Index of the closest center for every point, first one wins a tie
+    Works on chunks of points to keep the distance matrix small
+    """
+    num = len(horiz)
+    chunk = max(1, _CHUNK_CELLS // len(ctr_x))
+    labels = np.empty(num, dtype=np.intp)
+    for start in range(0, num, chunk):
+        stop = start + chunk
+        # squared distances give the same order, skip the sqrt
+        dists = _squared_distances(horiz[start:stop], vert[start:stop], ctr_x, ctr_y)
+        labels[start:stop] = np.argmin(dists, axis=1)
+    return labels
+
+
+def _nearest_two_centers(horiz, vert, ctr_x, ctr_y):
+    """
+    Like _nearest_centers, also returns the distance
+    to the closest and to the second closest center
+    """
+    num = len(horiz)
+    chunk = max(1, _CHUNK_CELLS // len(ctr_x))
+    labels = np.empty(num, dtype=np.intp)
+    firsts = np.empty(num, dtype=np.float64)
+    seconds = np.full(num, float('inf'))
+    for start in range(0, num, chunk):
+        stop = start + chunk
+        dists = _squared_distances(horiz[start:stop], vert[start:stop], ctr_x, ctr_y)
+        rows = np.arange(len(dists))
+        labels[start:stop] = np.argmin(dists, axis=1)
+        firsts[start:stop] = dists[rows, labels[start:stop]]
+        if len(ctr_x) > 1:
+            dists[rows, labels[start:stop]] = float('inf')
+            seconds[start:stop] = dists.min(axis=1)
+    return labels, np.sqrt(firsts), np.sqrt(seconds)
+
+
+class _HamerlyBounds:
+    """
+    Nearest center assignment that skips points with Hamerly's bounds
+
+    Every point keeps an upper bound on the distance to its center and
+    a lower bound on the distance to any other center. When the centers
+    move, the bounds are loosened by how far they moved. A point keeps
+    its center while the upper bound is below the lower bound, or below
+    half the distance from its center to the closest other center.
+    Only the remaining points are measured against all centers.
+    """
+
+    def __init__(self, horiz, vert):
+        """Bounds for the given points, computed on the first assignment"""
+        self._horiz = horiz
+        self._vert = vert
+        self._labels = None
+        self._upper = None
+        self._lower = None
+        self._ctr_x = None
+        self._ctr_y = None
+
+    def assign(self, ctr_x, ctr_y):
+        """Index of the closest center for every point, first one wins a tie"""
+        horiz, vert = self._horiz, self._vert
+        if self._labels is None:
+            self._labels, self._upper, self._lower = _nearest_two_centers(horiz, vert, ctr_x, ctr_y)
+        else:
+            self._move_centers(ctr_x, ctr_y)
+            labels, upper, lower = self._labels, self._upper, self._lower
+
+            # half the distance to the closest other center
+            dists = np.sqrt(_squared_distances(ctr_x, ctr_y, ctr_x, ctr_y))
+            np.fill_diagonal(dists, float('inf'))
+            bound = np.maximum(0.5 * dists.min(axis=1)[labels], lower) * (1 - _BOUND_SLACK)
+
+            # tighten the upper bound first, then a full search if that is not enough
+            check = np.flatnonzero(upper >= bound)
+            upper[check] = np.sqrt((vert[check] - ctr_y[labels[check]]) ** 2
+                                   + (horiz[check] - ctr_x[labels[check]]) ** 2)
+            check = check[upper[check] >= bound[check]]
+            labels[check], upper[check], lower[check] = _nearest_two_centers(
+                horiz[check], vert[check], ctr_x, ctr_y)
+
+        self._ctr_x, self._ctr_y = ctr_x, ctr_y
+        return self._labels.copy()
+
+    def _move_centers(self, ctr_x, ctr_y):
+        """Loosen the bounds by the center movements"""
+        moves = np.sqrt((ctr_y - self._ctr_y) ** 2 + (ctr_x - self._ctr_x) ** 2)
+        self._upper += moves[self._labels] * (1 + _BOUND_SLACK)
+        if len(moves) > 1:
+            # the furthest move of any center other than the own one
+            second, first = np.argsort(moves)[-2:]
+            self._lower -= np.where(self._labels == first, moves[second], moves[first]) * (1 + _BOUND_SLACK)
+
+
+def minibatch_kmeans_clustering(records, num_k, num_iter=1, batch_size=_BATCH_SIZE, keep_fips=False):
+    """
+    Mini-batch K-means Clustering over county records that
+    do not need to fit in memory as Cluster objects
+
+    parameter
+    ---------
+    records: a record array of data_loader.load_cancer_table, may be memory-mapped,
+        or a function returning a fresh iterable of such record arrays per pass,
+        e.g. lambda: data_loader.iter_cancer_chunks(data_url)
+    num_k: 'k', number of desired k-mean clusters
+    num_iter: 'q', number of passes over the records
+    batch_size: records per batch, when records is a record array
+    keep_fips: collect the fips codes of the clusters in the last pass,
+        this holds every fips code in memory
+
+    return
+    ------
+    a list of num_k clusters objects, without fips codes unless keep_fips
+
+    rationale
+    ---------
+    A first pass picks the most populous records as the initial centers,
+        like kmeans_clustering does. Then each batch is assigned to the
+        current centers, then every center moves to the population
+        weighted mean of all records it received so far in this pass.
+        One batch covering all the records is the same as
+        fast_kmeans_clustering. Only one batch and the k centers
+        are in memory at a time.
+    """
+    if callable(records):
+        passes = records
+    else:
+        def passes():
+            """One pass over the record array, batch_size records at a time"""
+            return (records[start:start+batch_size] for start in range(0, len(records), batch_size))
+
+    ctr_x, ctr_y = _most_populous(passes(), num_k)
+    for idx_iter in range(num_iter):
+        last = idx_iter == num_iter - 1
+        totals = np.zeros(num_k)
+        risks = np.zeros(num_k)
+        fips = [set() for _ in range(num_k)]
+
+        for batch in passes():
+            horiz = np.asarray(batch['horiz'], dtype=np.float64)
+            vert = np.asarray(batch['vert'], dtype=np.float64)
+            pops = np.asarray(batch['population'], dtype=np.float64)
+            labels = _nearest_centers(horiz, vert, ctr_x, ctr_y)
+
+            # running population weighted means of the centers
+            weights = np.bincount(labels, weights=pops, minlength=num_k)
+            totals += weights
+            has_points = weights > 0
+            ratio = np.where(has_points, weights / np.where(has_points, totals, 1), 0)
+            means_x = np.bincount(labels, weights=pops * horiz, minlength=num_k) / np.where(has_points, weights, 1)
+            means_y = np.bincount(labels, weights=pops * vert, minlength=num_k) / np.where(has_points, weights, 1)
+            ctr_x = ctr_x + ratio * (means_x - ctr_x)
+            ctr_y = ctr_y + ratio * (means_y - ctr_y)
+
+            if last:
+                risks += np.bincount(labels, weights=pops * np.asarray(batch['risk'], dtype=np.float64),
+                                     minlength=num_k)
+                if keep_fips:
+                    for code, label in zip(batch['fips'].tolist(), labels.tolist()):
+                        fips[label].add(code)
+
+    kmeans = []
+    for idx_k in range(num_k):
+        pop = int(round(totals[idx_k]))
+        risk = risks[idx_k] / totals[idx_k] if pop else 0
+        kmeans.append(alg_cluster.Cluster(fips[idx_k], ctr_x[idx_k], ctr_y[idx_k], pop, risk))
+    return kmeans
+
+
+def _most_populous(batches, num_k):
+    """
+    Coordinates of the num_k most populous records among all batches,
+    ordered as a stable sort by population would order them
+    """
+    pops = np.zeros(0)
+    horiz = vert = order = pops
+    seen = 0
+    for batch in batches:
+        pops = np.concatenate((pops, batch['population']))
+        horiz = np.concatenate((horiz, batch['horiz']))
+        vert = np.concatenate((vert, batch['vert']))
+        order = np.concatenate((order, np.arange(seen, seen + len(batch))))
+        seen += len(batch)
+
+        keep = np.lexsort((order, pops))[-num_k:]
+        pops, horiz, vert, order = pops[keep], horiz[keep], vert[keep], order[keep]
+
+    if len(pops) < num_k:
+        raise ValueError('fewer than num_k records')
+    return horiz, vert
+
+
+def build_fips_index(data_table):
+    """
+    Map every fips code to its line index in the data table,
+    build it once and pass it to compute_distortion
+
+    return
+    ------
+    {fips: line index ...}
+    """
+    return dict((line[0], line_idx) for line_idx, line in enumerate(data_table))
+
+
+def compute_cluster_errors(clusters, data_table, fips_index=None):
+    """
+    Computes the error of every cluster in one vectorized pass,
+    same values as Cluster.cluster_error
+
+    parameter
+    ---------
+    clusters: list, a list of clusters
+    data_table: the original data that used for calculating the clusters
+    fips_index: optional, prebuilt build_fips_index(data_table)
+
+    return
+    ------
+    array of cluster errors, in the order of clusters
+    """
+    if fips_index is None:
+        fips_index = build_fips_index(data_table)
+
+    # one data line and one cluster label for every county
+    labels, lines = [], []
+    for idx, cluster in enumerate(clusters):
+        for fips in cluster.fips_codes():
+            labels.append(idx)
+            lines.append(data_table[fips_index[fips]])
+
+    labels = np.array(labels, dtype=np.intp)
+    horiz = np.array([line[1] for line in lines], dtype=np.float64)
+    vert = np.array([line[2] for line in lines], dtype=np.float64)
+    pops = np.array([line[3] for line in lines], dtype=np.float64)
+    ctr_x = np.array([cluster.horiz_center() for cluster in clusters], dtype=np.float64)
+    ctr_y = np.array([cluster.vert_center() for cluster in clusters], dtype=np.float64)
+
+    errors = ((ctr_y[labels] - vert) ** 2 + (ctr_x[labels] - horiz) ** 2) * pops
+    return np.bincount(labels, weights=errors, minlength=len(clusters))
+
+
+def compute_distortion(clusters, data_table, fips_index=None):
     """
     Computes the distortion measure of a given list of clusters
 
@@ -217,6 +804,8 @@ def compute_distortion(clusters, data_table):
     ---------
     clusters: list, a list of clusters
     data_table: the original data that used for calculating the clusters
+    fips_index: optional, prebuilt build_fips_index(data_table)
+        saves the index building when called many times on one table
 
     return 
     ------
@@ -227,8 +816,63 @@ def compute_distortion(clusters, data_table):
     distortion = sum of errors of all clusters
     cluster error = population weighted sum of member distance to the cluster center
     """
-    distor = 0
-    for cluster in clusters:
-        error = cluster.cluster_error(data_table)
-        distor += error
-    return distor
\ No newline at end of file
+    return float(compute_cluster_errors(clusters, data_table, fips_index).sum())
+
+
+def hierarchical_distortion_curve(clusters, data_table, ks, fips_index=None):
+    """
+    Hierarchical Clustering for many k in one run, with the distortion
+    at each k. The input clusters are not mutated.
+
+    parameter
+    ---------
+    clusters: list of clusters to start from
+    data_table: the original data that used for calculating the clusters
+    ks: the numbers of clusters to record
+    fips_index: optional, prebuilt build_fips_index(data_table)
+
+    return
+    ------
+    {k: (list of clusters, distortion) ...}
+        same clusters as fast_hierarchical_clustering(clusters, k)
+
+    rationale
+    ---------
+    Agglomerative clustering passes through every k on its way down,
+    so the clusters are copied out whenever a requested k is reached.
+    The distortion is kept up to date on each merge, the error of two
+    merged clusters grows by pop_u * pop_v / (pop_u + pop_v) * dist**2
+    as long as the centers are the population weighted means of their
+    counties, which merge_clusters maintains.
+    """
+    _clusters = [cluster.copy() for cluster in clusters]
+    distortion = compute_distortion(_clusters, data_table, fips_index)
+    removed = set()
+    curve = {}
+
+    def snapshot():
+        """copy out the live clusters"""
+        live = [cluster.copy() for idx, cluster in enumerate(_clusters) if idx not in removed]
+        live.sort(key=lambda x: x.horiz_center())
+        return live, distortion
+
+    wanted = set(ks)
+    num = len(_clusters)
+    for num_k in wanted:
+        if num_k >= num:
+            curve[num_k] = snapshot()
+
+    if not wanted or min(wanted) >= num:
+        return curve
+
+    for idx_u, idx_v, dist in _centroid_merges(_clusters, min(wanted)):
+        removed.add(idx_v)
+        pop_v = _clusters[idx_v].total_population()
+        pop_u = _clusters[idx_u].total_population() - pop_v
+        if pop_u + pop_v > 0:
+            distortion += float(pop_u) * pop_v / (pop_u + pop_v) * dist ** 2
+
+        if num - len(removed) in wanted:
+            curve[num - len(removed)] = snapshot()
+
+    return curve
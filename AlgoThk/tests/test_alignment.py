@@ -1,5 +1,11 @@
 import pytest
+import random
+from pytest import approx
 from ..alignment import build_scoring_matrix, create_matrix, compute_alignment_matrix
+from ..alignment import compute_alignment_score, _matrix_max, AlignmentMatrix
+from ..alignment import compute_global_alignment_linear, fast_compute_alignment_matrix
+from ..alignment import compute_banded_alignment_matrix, compute_banded_alignment
+from ..alignment import compute_affine_alignment_score, compute_affine_alignment
 from ..alignment import compute_global_alignment, compute_local_alignment
 
 
@@ -109,3 +115,311 @@ def test_compute_global_alignment(seq_x, seq_y, scores, aligns, expected):
 def test_compute_local_alignment(seq_x, seq_y, scores, aligns, expected):
     assert compute_local_alignment(seq_x, seq_y, scores, aligns) == expected
 
+
+@pytest.mark.parametrize('len_x, len_y', [(0, 0), (0, 5), (5, 0), (1, 1), (7, 30), (30, 7), (25, 25)])
+def test_compute_alignment_score(len_x, len_y):
+    rand = random.Random(len_x * 100 + len_y)
+    for scores in [build_scoring_matrix(set('ACGT'), 10, 4, -6),
+                   build_scoring_matrix(set('ACGT'), 2, -1, -1),
+                   build_scoring_matrix(set('ACGT'), 1, 1, 0)]:
+        seq_x = ''.join(rand.choice('ACGT') for _ in range(len_x))
+        seq_y = ''.join(rand.choice('ACGT') for _ in range(len_y))
+
+        aligns = compute_alignment_matrix(seq_x, seq_y, scores, True)
+        assert compute_alignment_score(seq_x, seq_y, scores, True) == aligns[-1][-1]
+
+        aligns = compute_alignment_matrix(seq_x, seq_y, scores, False)
+        assert compute_alignment_score(seq_x, seq_y, scores, False) == _matrix_max(aligns)
+
+
+def test_compute_alignment_score_asymmetric():
+    scores = build_scoring_matrix(set('AB'), 5, 1, -2)
+    scores['A']['B'] = -3
+    for seq_x, seq_y in [('AB', 'BBBAB'), ('BBBAB', 'AB'), ('AAB', 'ABBBA')]:
+        for global_flag in (True, False):
+            aligns = compute_alignment_matrix(seq_x, seq_y, scores, global_flag)
+            expected = aligns[-1][-1] if global_flag else _matrix_max(aligns)
+            assert compute_alignment_score(seq_x, seq_y, scores, global_flag) == expected
+
+
+@pytest.mark.parametrize('len_x, len_y', [(0, 0), (0, 5), (5, 0), (1, 40), (40, 1), (80, 90), (200, 150), (300, 7)])
+def test_compute_global_alignment_linear(len_x, len_y):
+    rand = random.Random(len_x * 1000 + len_y)
+    for scores in [build_scoring_matrix(set('ACGT'), 10, 4, -6),
+                   build_scoring_matrix(set('ACGT'), 2, -1, -1),
+                   build_scoring_matrix(set('ACGT'), 5, -8, -1)]:
+        seq_x = ''.join(rand.choice('ACGT') for _ in range(len_x))
+        seq_y = ''.join(rand.choice('ACGT') for _ in range(len_y))
+        aligns = compute_alignment_matrix(seq_x, seq_y, scores, True)
+        expected = compute_global_alignment(seq_x, seq_y, scores, aligns)
+
+        score, _x2, _y2 = compute_global_alignment_linear(seq_x, seq_y, scores)
+        assert score == expected[0]
+        assert len(_x2) == len(_y2)
+        assert _x2.replace('-', '') == seq_x
+        assert _y2.replace('-', '') == seq_y
+
+
+def test_compute_global_alignment_linear_small():
+    scores = build_scoring_matrix(set(['A','T']), 10, 4, -6)
+    assert compute_global_alignment_linear('AA', 'TAAT', scores) == (8, '-AA-', 'TAAT')
+
+
+@pytest.mark.parametrize('len_x, len_y', [(0, 0), (0, 5), (5, 0), (1, 1), (7, 30), (30, 7), (60, 60)])
+def test_fast_compute_alignment_matrix(len_x, len_y):
+    rand = random.Random(len_x * 100 + len_y)
+    for scores in [build_scoring_matrix(set('ACGT'), 10, 4, -6),
+                   build_scoring_matrix(set('ACGT'), 2, -1, -1),
+                   build_scoring_matrix(set('ACGT'), 5, -8, -3)]:
+        seq_x = ''.join(rand.choice('ACGT') for _ in range(len_x))
+        seq_y = ''.join(rand.choice('ACGT') for _ in range(len_y))
+        for global_flag in (True, False):
+            fast = fast_compute_alignment_matrix(seq_x, seq_y, scores, global_flag)
+            assert fast.shape == (len_x + 1, len_y + 1)
+            assert fast.tolist() == compute_alignment_matrix(seq_x, seq_y, scores, global_flag)
+
+
+def test_fast_compute_alignment_matrix_float():
+    scores = build_scoring_matrix(set('ACGT'), 1.5, -0.25, -0.75)
+    scores['A']['C'] = -1.0
+    for global_flag in (True, False):
+        fast = fast_compute_alignment_matrix('ACGTTACA', 'CAGATTACG', scores, global_flag)
+        expected = compute_alignment_matrix('ACGTTACA', 'CAGATTACG', scores, global_flag)
+        for row, exp in zip(fast.tolist(), expected):
+            assert row == approx(exp)
+
+    with pytest.raises(KeyError):
+        fast_compute_alignment_matrix('AXA', 'ACA', scores, True)
+
+
+def mutate(rand, seq, num, alph='ACGT'):
+    """Apply num random substitutions, insertions or deletions"""
+    seq = list(seq)
+    for _ in range(num):
+        pos = rand.randrange(len(seq) + 1)
+        kind = rand.choice(['sub', 'ins', 'del'])
+        if kind == 'ins' or not seq:
+            seq.insert(pos, rand.choice(alph))
+        elif kind == 'sub':
+            seq[min(pos, len(seq) - 1)] = rand.choice(alph)
+        else:
+            del seq[min(pos, len(seq) - 1)]
+    return ''.join(seq)
+
+
+@pytest.mark.parametrize('len_x, len_y, band_width', [(0, 0, 0), (0, 4, 4), (4, 0, 5), (12, 9, 3), (9, 12, 7), (20, 20, 2)])
+def test_compute_banded_alignment_matrix(len_x, len_y, band_width):
+    rand = random.Random(len_x * 100 + len_y)
+    scores = build_scoring_matrix(set('ACGT'), 5, -3, -4)
+    seq_x = ''.join(rand.choice('ACGT') for _ in range(len_x))
+    seq_y = ''.join(rand.choice('ACGT') for _ in range(len_y))
+    for global_flag in (True, False):
+        band = compute_banded_alignment_matrix(seq_x, seq_y, scores, global_flag, band_width)
+        assert band.shape == (len_x + 1, 2 * band_width + 1)
+        if band_width >= max(len_x, len_y):
+            aligns = compute_alignment_matrix(seq_x, seq_y, scores, global_flag)
+            for row_i in range(len_x + 1):
+                for col_j in range(len_y + 1):
+                    assert band[row_i][col_j - row_i + band_width] == aligns[row_i][col_j]
+        # a band only removes paths
+        full = fast_compute_alignment_matrix(seq_x, seq_y, scores, global_flag)
+        for row_i in range(len_x + 1):
+            for diag in range(2 * band_width + 1):
+                if 0 <= row_i + diag - band_width <= len_y:
+                    assert band[row_i][diag] <= full[row_i][row_i + diag - band_width]
+
+
+@pytest.mark.parametrize('seed', range(6))
+def test_compute_banded_alignment_full(seed):
+    rand = random.Random(seed)
+    scores = build_scoring_matrix(set('ACGT'), 10, 4, -6)
+    seq_x = ''.join(rand.choice('ACGT') for _ in range(rand.randint(0, 25)))
+    seq_y = ''.join(rand.choice('ACGT') for _ in range(rand.randint(0, 25)))
+    width = max(len(seq_x), len(seq_y))
+    aligns = compute_alignment_matrix(seq_x, seq_y, scores, True)
+    assert compute_banded_alignment(seq_x, seq_y, scores, True, width) == compute_global_alignment(seq_x, seq_y, scores, aligns)
+    aligns = compute_alignment_matrix(seq_x, seq_y, scores, False)
+    assert compute_banded_alignment(seq_x, seq_y, scores, False, width) == compute_local_alignment(seq_x, seq_y, scores, aligns)
+
+
+@pytest.mark.parametrize('seed', range(6))
+def test_compute_banded_alignment_close(seed):
+    rand = random.Random(seed)
+    scores = build_scoring_matrix(set('ACGT'), 5, -4, -8)
+    seq_x = ''.join(rand.choice('ACGT') for _ in range(300))
+    seq_y = mutate(rand, seq_x, 6)
+    for global_flag in (True, False):
+        expected = compute_alignment_score(seq_x, seq_y, scores, global_flag)
+        if not global_flag:
+            expected = expected[0]
+        score, _x2, _y2 = compute_banded_alignment(seq_x, seq_y, scores, global_flag, 1, auto=True)
+        assert score == expected
+        assert score == sum(scores[char_x][char_y] for char_x, char_y in zip(_x2, _y2))
+        if global_flag:
+            assert (_x2.replace('-', ''), _y2.replace('-', '')) == (seq_x, seq_y)
+
+
+@pytest.mark.parametrize('seed', range(6))
+def test_compute_banded_alignment_float(seed):
+    rand = random.Random(seed)
+    scores = build_scoring_matrix(set('ACGT'), 1.1, -0.3, -0.7)
+    seq_x = ''.join(rand.choice('ACGT') for _ in range(60))
+    seq_y = mutate(rand, seq_x, 4)
+    for global_flag in (True, False):
+        score, _x2, _y2 = compute_banded_alignment(seq_x, seq_y, scores, global_flag, 3, auto=True)
+        assert sum(scores[char_x][char_y] for char_x, char_y in zip(_x2, _y2)) == approx(score)
+        if global_flag:
+            assert (_x2.replace('-', ''), _y2.replace('-', '')) == (seq_x, seq_y)
+
+
+def test_compute_banded_alignment_narrow():
+    scores = build_scoring_matrix(set('ACGT'), 10, 4, -6)
+    with pytest.raises(ValueError):
+        compute_banded_alignment('ACGTACGT', 'ACG', scores, True, 2)
+    score, _x2, _y2 = compute_banded_alignment('ACGTACGT', 'ACG', scores, True, 2, auto=True)
+    assert score == compute_alignment_score('ACGTACGT', 'ACG', scores, True)
+    assert compute_banded_alignment('AA', 'TAAT', scores, True, 2) == (8, '-AA-', 'TAAT')
+
+
+def gotoh_score(seq_x, seq_y, scores, gap_open, gap_extend, global_flag):
+    """Plain Gotoh recurrence, cell by cell"""
+    neg = float('-inf')
+    len_x, len_y = len(seq_x), len(seq_y)
+    mat_h = create_matrix(len_x + 1, len_y + 1, 0)
+    mat_e = create_matrix(len_x + 1, len_y + 1, neg)
+    mat_f = create_matrix(len_x + 1, len_y + 1, neg)
+    if global_flag:
+        for idx_i in range(1, len_x + 1):
+            mat_h[idx_i][0] = mat_f[idx_i][0] = gap_open + idx_i * gap_extend
+        for idx_j in range(1, len_y + 1):
+            mat_h[0][idx_j] = mat_e[0][idx_j] = gap_open + idx_j * gap_extend
+    for idx_i in range(1, len_x + 1):
+        for idx_j in range(1, len_y + 1):
+            mat_e[idx_i][idx_j] = max(mat_e[idx_i][idx_j-1], mat_h[idx_i][idx_j-1] + gap_open) + gap_extend
+            mat_f[idx_i][idx_j] = max(mat_f[idx_i-1][idx_j], mat_h[idx_i-1][idx_j] + gap_open) + gap_extend
+            mat_h[idx_i][idx_j] = max(mat_h[idx_i-1][idx_j-1] + scores[seq_x[idx_i-1]][seq_y[idx_j-1]],
+                                      mat_e[idx_i][idx_j], mat_f[idx_i][idx_j], 0 if not global_flag else neg)
+    if global_flag:
+        return mat_h[len_x][len_y]
+    return _matrix_max(mat_h)
+
+
+def affine_score(_x2, _y2, scores, gap_open, gap_extend):
+    """Score of two aligned sequences with affine gaps"""
+    score = 0
+    for idx, (char_x, char_y) in enumerate(zip(_x2, _y2)):
+        if char_x == '-':
+            score += gap_extend + (gap_open if idx == 0 or _x2[idx-1] != '-' else 0)
+        elif char_y == '-':
+            score += gap_extend + (gap_open if idx == 0 or _y2[idx-1] != '-' else 0)
+        else:
+            score += scores[char_x][char_y]
+    return score
+
+
+@pytest.mark.parametrize('gap_open, gap_extend', [(0, -4), (-10, -1), (-5, -2), (-3, 0)])
+@pytest.mark.parametrize('len_x, len_y', [(0, 0), (0, 6), (6, 0), (1, 1), (9, 14), (20, 20)])
+def test_compute_affine_alignment_score(gap_open, gap_extend, len_x, len_y):
+    rand = random.Random(len_x * 100 + len_y)
+    scores = build_scoring_matrix(set('ACGT'), 5, -3, gap_extend)
+    seq_x = ''.join(rand.choice('ACGT') for _ in range(len_x))
+    seq_y = ''.join(rand.choice('ACGT') for _ in range(len_y))
+    for global_flag in (True, False):
+        expected = gotoh_score(seq_x, seq_y, scores, gap_open, gap_extend, global_flag)
+        assert compute_affine_alignment_score(seq_x, seq_y, scores, gap_open, gap_extend, global_flag) == expected
+        if gap_open == 0:
+            assert expected == compute_alignment_score(seq_x, seq_y, scores, global_flag)
+
+
+@pytest.mark.parametrize('gap_open, gap_extend', [(0, -4), (-10, -1), (-5, -2), (-3, 0)])
+@pytest.mark.parametrize('seed', range(4))
+def test_compute_affine_alignment(gap_open, gap_extend, seed):
+    rand = random.Random(seed)
+    scores = build_scoring_matrix(set('ACGT'), 5, -3, gap_extend)
+    seq_x = ''.join(rand.choice('ACGT') for _ in range(rand.randint(0, 30)))
+    seq_y = mutate(rand, seq_x, 5) if seed % 2 else ''.join(rand.choice('ACGT') for _ in range(rand.randint(0, 30)))
+    for global_flag in (True, False):
+        score, _x2, _y2 = compute_affine_alignment(seq_x, seq_y, scores, gap_open, gap_extend, global_flag)
+        expected = compute_affine_alignment_score(seq_x, seq_y, scores, gap_open, gap_extend, global_flag)
+        assert score == (expected if global_flag else expected[0])
+        assert len(_x2) == len(_y2)
+        assert affine_score(_x2, _y2, scores, gap_open, gap_extend) == score
+        if global_flag:
+            assert (_x2.replace('-', ''), _y2.replace('-', '')) == (seq_x, seq_y)
+        else:
+            assert _x2.replace('-', '') in seq_x
+            assert _y2.replace('-', '') in seq_y
+
+
+@pytest.mark.parametrize('seed', range(6))
+def test_compute_affine_alignment_float(seed):
+    rand = random.Random(seed)
+    scores = build_scoring_matrix(set('ACGT'), 1.1, -0.3, -0.4)
+    seq_x = ''.join(rand.choice('ACGT') for _ in range(rand.randint(1, 40)))
+    seq_y = mutate(rand, seq_x, 5) if seed % 2 else ''.join(rand.choice('ACGT') for _ in range(rand.randint(1, 40)))
+    for global_flag in (True, False):
+        score, _x2, _y2 = compute_affine_alignment(seq_x, seq_y, scores, -2.5, -0.4, global_flag)
+        assert affine_score(_x2, _y2, scores, -2.5, -0.4) == approx(score)
+        if global_flag:
+            assert (_x2.replace('-', ''), _y2.replace('-', '')) == (seq_x, seq_y)
+
+
+def test_compute_affine_alignment_gaps():
+    scores = build_scoring_matrix(set('ACGT'), 5, -3, -1)
+    # one long gap beats several short ones
+    assert compute_affine_alignment('ACGTTTTACG', 'ACGACG', scores, -10, -1, True) == (16, 'ACGTTTTACG', 'ACG----ACG')
+    with pytest.raises(ValueError):
+        compute_affine_alignment_score('AC', 'AG', scores, 1, -1, True)
+    score = compute_affine_alignment_score('ACGT', 'ACGT', build_scoring_matrix(set('ACGT'), 1.5, -1, -1), -2.5, -0.5, False)
+    assert score == (6.0, 4, 4)
+
+
+@pytest.mark.parametrize('len_x, len_y', [(0, 0), (0, 5), (5, 0), (12, 30), (30, 12), (40, 40)])
+def test_alignment_traceback_inputs(len_x, len_y):
+    rand = random.Random(len_x * 100 + len_y)
+    scores = build_scoring_matrix(set('ACGT'), 2, -1, -1)
+    seq_x = ''.join(rand.choice('ACGT') for _ in range(len_x))
+    seq_y = ''.join(rand.choice('ACGT') for _ in range(len_y))
+    for global_flag, align in [(True, compute_global_alignment), (False, compute_local_alignment)]:
+        aligns = compute_alignment_matrix(seq_x, seq_y, scores, global_flag)
+        assert isinstance(aligns, AlignmentMatrix)
+        assert aligns.max_cell == _matrix_max(aligns)
+
+        expected = align(seq_x, seq_y, scores, aligns)
+        assert align(seq_x, seq_y, scores, [list(row) for row in aligns]) == expected
+        fast = align(seq_x, seq_y, scores, fast_compute_alignment_matrix(seq_x, seq_y, scores, global_flag))
+        assert fast == expected
+        assert type(fast[0]) is type(expected[0])
+
+
+def test_alignment_traceback_long():
+    scores = build_scoring_matrix(set('ACGT'), 10, 4, -6)
+    seq_x = 'ACGT' * 5000
+    seq_y = 'GT'
+    aligns = fast_compute_alignment_matrix(seq_x, seq_y, scores, True)
+    score, _x2, _y2 = compute_global_alignment(seq_x, seq_y, scores, aligns)
+    assert _x2 == seq_x
+    assert _y2 == '-' * (len(seq_x) - 2) + 'GT'
+    assert score == compute_alignment_score(seq_x, seq_y, scores, True)
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_alignment_traceback_float(seed):
+    # array matrices of float scores round differently from tile + score
+    rand = random.Random(seed)
+    scores = build_scoring_matrix(set('ACGT'), 1.1, -0.3, -0.7)
+    seq_x = ''.join(rand.choice('ACGT') for _ in range(rand.randint(1, 30)))
+    seq_y = mutate(rand, seq_x, 4) if seed % 2 else ''.join(rand.choice('ACGT') for _ in range(rand.randint(1, 30)))
+    for global_flag, align in [(True, compute_global_alignment), (False, compute_local_alignment)]:
+        fast = fast_compute_alignment_matrix(seq_x, seq_y, scores, global_flag)
+        score, _x2, _y2 = align(seq_x, seq_y, scores, fast)
+        assert sum(scores[char_x][char_y] for char_x, char_y in zip(_x2, _y2)) == approx(score)
+        assert score == approx(align(seq_x, seq_y, scores, compute_alignment_matrix(seq_x, seq_y, scores, global_flag))[0])
+        if global_flag:
+            assert (_x2.replace('-', ''), _y2.replace('-', '')) == (seq_x, seq_y)
+
+
+def test_alignment_traceback_float_example():
+    scores = build_scoring_matrix(set('ACGT'), 1.1, -0.3, -0.7)
+    aligns = fast_compute_alignment_matrix('ACGTTGCA', 'AGTTGA', scores, True)
+    assert compute_global_alignment('ACGTTGCA', 'AGTTGA', scores, aligns)[1:] == ('ACGTTGCA', 'A-GTTG-A')
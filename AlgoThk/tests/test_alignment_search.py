@@ -0,0 +1,136 @@
+import pytest
+import random
+import itertools
+import pickle
+import numpy as np
+from ..alignment import build_scoring_matrix, compute_alignment_matrix, QueryProfile, _transpose_scores
+from ..alignment import compute_global_alignment, compute_local_alignment
+from pytest import approx
+from ..alignment_search import score_database, search_database, _score_targets, _null_scores
+from ..alignment_search import generate_null_distribution, permutation_test
+from .. import alignment_search
+
+
+def random_database(seed, num, max_len, alph='ACGT'):
+    rand = random.Random(seed)
+    return [''.join(rand.choice(alph) for _ in range(rand.randint(0, max_len))) for _ in range(num)]
+
+
+@pytest.fixture
+def dna_scores():
+    scores = build_scoring_matrix(set('ACGT'), 10, 4, -6)
+    scores['A']['C'] = -2  # not symmetric
+    return scores
+
+
+@pytest.mark.parametrize('global_flag', [True, False])
+def test_score_database(dna_scores, global_flag):
+    query = 'ACGTTGCAAC'
+    targets = random_database(1, 150, 30)
+    expected = []
+    for target in targets:
+        aligns = compute_alignment_matrix(query, target, dna_scores, global_flag)
+        if global_flag:
+            expected.append(compute_global_alignment(query, target, dna_scores, aligns)[0])
+        else:
+            expected.append(compute_local_alignment(query, target, dna_scores, aligns)[0])
+
+    assert score_database(query, targets, dna_scores, global_flag) == expected
+    assert score_database(query, targets, dna_scores, global_flag, max_workers=2) == expected
+    assert score_database(query, [], dna_scores, global_flag) == []
+
+
+@pytest.mark.parametrize('global_flag', [True, False])
+def test_search_database(dna_scores, global_flag):
+    query = 'ACGTTGCAAC'
+    targets = random_database(2, 100, 20) + [query]
+    target_scores = score_database(query, targets, dna_scores, global_flag)
+
+    hits = search_database(query, targets, dna_scores, 5, global_flag)
+    assert len(hits) == 5
+    assert hits[0][1] == len(targets) - 1
+    assert hits[0][2] == hits[0][3] == query
+    assert [hit[0] for hit in hits] == sorted(target_scores, reverse=True)[:5]
+
+    for score, idx, _x2, _y2 in hits:
+        aligns = compute_alignment_matrix(query, targets[idx], dna_scores, global_flag)
+        if global_flag:
+            expected = compute_global_alignment(query, targets[idx], dna_scores, aligns)
+        else:
+            expected = compute_local_alignment(query, targets[idx], dna_scores, aligns)
+        assert (score, _x2, _y2) == expected
+        assert score == target_scores[idx]
+
+    assert search_database(query, targets, dna_scores, 5, global_flag, max_workers=2) == hits
+    assert len(search_database(query, targets[:3], dna_scores, 5, global_flag)) == 3
+
+
+@pytest.mark.parametrize('global_flag', [True, False])
+def test_search_database_float(global_flag):
+    scores = build_scoring_matrix(set('ACGT'), 1.1, -0.3, -0.7)
+    query = 'ACGTTGCAAT'
+    targets = random_database(3, 50, 15)
+    for score, idx, _x2, _y2 in search_database(query, targets, scores, 10, global_flag):
+        assert sum(scores[char_x][char_y] for char_x, char_y in zip(_x2, _y2)) == approx(score)
+        if global_flag:
+            assert (_x2.replace('-', ''), _y2.replace('-', '')) == (query, targets[idx])
+
+
+def test_score_targets_task(dna_scores):
+    # a spawned worker only sees the pickled task
+    targets = random_database(4, 10, 20)
+    task = (QueryProfile('ACGTTGCAAC', _transpose_scores(dna_scores)), targets, False)
+    assert _score_targets(pickle.loads(pickle.dumps(task, 2))) == score_database('ACGTTGCAAC', targets, dna_scores)
+
+
+def test_generate_null_distribution(dna_scores):
+    seq_x, seq_y = 'ACGTTGCAACGTA', 'TTGCACG'
+    dist = generate_null_distribution(seq_x, seq_y, dna_scores, 100, seed=5)
+    assert sum(dist.values()) == 100
+    assert dist == generate_null_distribution(seq_x, seq_y, dna_scores, 100, seed=5, max_workers=2)
+
+    # every null score is the local score of some shuffle of seq_y
+    reachable = set()
+    for shuffled in set(itertools.permutations(seq_y)):
+        shuffled = ''.join(shuffled)
+        aligns = compute_alignment_matrix(seq_x, shuffled, dna_scores, False)
+        reachable.add(compute_local_alignment(seq_x, shuffled, dna_scores, aligns)[0])
+    assert set(dist) <= reachable
+
+
+def test_null_scores_task(dna_scores):
+    seq_x, seq_y = 'ACGTTGCAACGTA', 'TTGCACG'
+    task = (QueryProfile(seq_x, _transpose_scores(dna_scores)), np.array(list(seq_y)), False, [1, 2, 3])
+    scores = _null_scores(pickle.loads(pickle.dumps(task, 2)))
+    assert scores == _null_scores(task)
+    assert len(scores) == 3
+
+
+def test_permutation_test(dna_scores):
+    seq_x = 'ACGTTGCAACGTAGGCTTAACG'
+    res = permutation_test(seq_x, seq_x, dna_scores, 200, seed=1)
+    assert res['score'] == 10 * len(seq_x)
+    assert sum(res['null'].values()) == 200
+    assert res['mean'] == approx(sum(k * v for k, v in res['null'].items()) / 200.0)
+    assert res['stdev'] > 0
+    assert res['zscore'] == approx((res['score'] - res['mean']) / res['stdev'])
+    assert res['zscore'] > 3
+
+    # one letter shuffles to itself, the null is constant
+    res = permutation_test('AAAA', 'AAA', dna_scores, 10, seed=1)
+    assert res['null'] == {30: 10}
+    assert res['stdev'] == 0
+    assert res['zscore'] == 0
+
+
+def test_permutation_test_constant_null(dna_scores, monkeypatch):
+    # a score below a constant null is not significant
+    monkeypatch.setattr(alignment_search, 'generate_null_distribution', lambda *args: {100: 10})
+    res = permutation_test('ACG', 'ACG', dna_scores, 10, seed=1)
+    assert res['score'] < res['mean']
+    assert res['zscore'] == float('-inf')
+
+
+def test_permutation_test_no_trials(dna_scores):
+    with pytest.raises(ValueError):
+        permutation_test('ACGT', 'ACG', dna_scores, 0)
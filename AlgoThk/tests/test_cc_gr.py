@@ -1,5 +1,8 @@
 import pytest
+import random
 from ..cc_gr import bfs_visited, cc_visited, largest_cc_size, compute_resilience
+from ..cc_gr import fast_compute_resilience
+from ..graph_gen import algo_er, algo_upa
 
 
 @pytest.fixture
@@ -93,3 +96,26 @@ def test_compute_resilience(ugraph_case1):
     graph = ugraph_case1
     res = compute_resilience(graph, [2, 1, 4])
     assert res == [4, 4, 2, 1]
+
+
+def test_fast_compute_resilience(ugraph_case1, ugraph_case2, ugraph_case3, ugraph_case4):
+    assert fast_compute_resilience(ugraph_case1, [2, 1, 4]) == [4, 4, 2, 1]
+    for graph in [ugraph_case1, ugraph_case2, ugraph_case3, ugraph_case4]:
+        for num in range(len(graph) + 1):
+            order = list(graph)[:num]
+            assert fast_compute_resilience(graph, order) == compute_resilience(graph, order)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_fast_compute_resilience_random(seed):
+    random.seed(seed)
+    for graph in [algo_er(60, 0.04), algo_upa(80, 3)]:
+        order = list(graph)
+        random.shuffle(order)
+        order = order[:seed * 15]
+        assert fast_compute_resilience(graph, order) == compute_resilience(graph, order)
+
+
+def test_fast_compute_resilience_repeated(ugraph_case1):
+    with pytest.raises(ValueError):
+        fast_compute_resilience(ugraph_case1, [2, 1, 2])
@@ -0,0 +1,57 @@
+import pytest
+from pytest import approx
+from ..cluster_runner import run_config, run_configs, format_results, RESULT_FIELDS
+from ..alg_cluster import Cluster
+from ..pair import fast_hierarchical_clustering, compute_distortion
+from .test_pair import load_data_table
+
+
+DATA_111 = r'AlgoThk/data/unifiedCancerData_111.csv'
+DATA_290 = r'AlgoThk/data/unifiedCancerData_290.csv'
+
+
+def test_run_config():
+    res = run_config((DATA_111, 'hierarch', 9, 1, 3))
+    assert tuple(sorted(res)) == tuple(sorted(RESULT_FIELDS))
+    assert res['num_iter'] is None and res['seed'] is None
+    assert res['distortion'] == approx(1.752e11, rel=1e-3)
+    assert res['seconds'] >= 0
+
+    res = run_config((DATA_111, 'kmeans', 9, 5, None))
+    assert res['distortion'] == approx(2.712e11, rel=1e-3)
+
+    # minibatch starts from the most populous records, no seed
+    res = run_config((DATA_111, 'minibatch', 9, 5, 3))
+    assert res['num_iter'] == 5 and res['seed'] is None
+
+    with pytest.raises(ValueError):
+        run_config((DATA_111, 'spectral', 9, 5, None))
+
+
+def test_run_config_seed():
+    res1 = run_config((DATA_290, 'kmeans', 15, 5, 7))
+    res2 = run_config((DATA_290, 'kmeans', 15, 5, 7))
+    assert res1['distortion'] == res2['distortion']
+
+
+def test_run_configs_parallel():
+    configs = [(data_url, algo, k, 5, seed)
+               for data_url in (DATA_111, DATA_290)
+               for algo in ('hierarch', 'kmeans', 'minibatch')
+               for k in (9, 15)
+               for seed in (None, 1)]
+    serial = run_configs(configs, max_workers=1)
+    parallel = run_configs(configs, max_workers=2)
+
+    assert len(parallel) == len(configs)
+    for config, res, other in zip(configs, parallel, serial):
+        data_url, algo, num_k, num_iter, seed = config
+        if algo == 'hierarch':
+            num_iter = None
+        if algo != 'kmeans':
+            seed = None
+        assert tuple(res[field] for field in RESULT_FIELDS[:5]) == (data_url, algo, num_k, num_iter, seed)
+        assert res['distortion'] == other['distortion']
+
+    text = format_results(parallel)
+    assert len(text.splitlines()) == len(configs) + 1
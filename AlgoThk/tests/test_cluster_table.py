@@ -0,0 +1,169 @@
+import pytest
+import sys
+from pytest import approx
+from ..cluster_table import ClusterTable
+from ..alg_cluster import Cluster
+from .test_pair import load_data_table, set_of_county_tuples
+
+
+@pytest.fixture
+def cancer_24():
+    return load_data_table(r'AlgoThk/data/unifiedCancerData_24.csv')
+
+
+def singletons(data_table):
+    return [Cluster(set([d[0]]), *d[1:]) for d in data_table]
+
+
+def test_from_data_table(cancer_24):
+    table = ClusterTable.from_data_table(cancer_24)
+    assert len(table) == 24
+    assert list(table.indexes()) == list(range(24))
+
+    for idx, line in enumerate(cancer_24):
+        assert table.fips_codes(idx) == set([line[0]])
+        assert table.horiz_center(idx) == line[1]
+        assert table.vert_center(idx) == line[2]
+        assert table.total_population(idx) == line[3]
+        assert table.averaged_risk(idx) == line[4]
+
+    clusters = table.to_clusters()
+    assert set_of_county_tuples(clusters) == set_of_county_tuples(singletons(cancer_24))
+
+
+def test_from_clusters_round_trip():
+    clusters = [
+        Cluster(set(['01', '02']), 1.0, 2.0, 30, 0.5),
+        Cluster(set(), 3.0, 4.0, 0, 0),
+        Cluster(set(['03']), 5.0, 6.0, 10, 0.25),
+    ]
+    table = ClusterTable.from_clusters(clusters)
+    assert len(table) == 3
+    assert table.fips_codes(0) == set(['01', '02'])
+    assert table.fips_codes(1) == set()
+
+    for cluster, other in zip(clusters, table.to_clusters()):
+        assert cluster.fips_codes() == other.fips_codes()
+        assert (cluster.horiz_center(), cluster.vert_center()) == (other.horiz_center(), other.vert_center())
+        assert cluster.total_population() == other.total_population()
+        assert cluster.averaged_risk() == other.averaged_risk()
+
+
+def test_merge_same_as_cluster(cancer_24):
+    table = ClusterTable.from_data_table(cancer_24)
+    clusters = singletons(cancer_24)
+
+    for idx_u, idx_v in [(0, 1), (2, 3), (0, 2), (5, 4), (5, 0), (23, 5)]:
+        table.merge(idx_u, idx_v)
+        clusters[idx_u].merge_clusters(clusters[idx_v])
+
+        assert table.fips_codes(idx_u) == clusters[idx_u].fips_codes()
+        assert table.horiz_center(idx_u) == clusters[idx_u].horiz_center()
+        assert table.vert_center(idx_u) == clusters[idx_u].vert_center()
+        assert table.total_population(idx_u) == clusters[idx_u].total_population()
+        assert table.averaged_risk(idx_u) == clusters[idx_u].averaged_risk()
+
+    assert len(table) == 18
+    assert 23 in table.indexes()
+    assert 0 not in table.indexes()
+    assert sum(len(c.fips_codes()) for c in table.to_clusters()) == 24
+
+
+def test_merge_empty():
+    table = ClusterTable.from_clusters([Cluster(set(['01']), 1.0, 1.0, 5, 0.1),
+                                        Cluster(set(), 9.0, 9.0, 0, 0)])
+    table.merge(0, 1)
+    assert len(table) == 2
+    assert table.horiz_center(0) == 1.0
+
+
+def test_merge_groups(cancer_24):
+    table = ClusterTable.from_data_table(cancer_24)
+    labels = [idx % 3 for idx in range(24)]
+    table.merge_groups(labels)
+
+    assert list(table.indexes()) == [0, 1, 2]
+    for label in range(3):
+        members = [line for idx, line in enumerate(cancer_24) if idx % 3 == label]
+        total = sum(line[3] for line in members)
+        assert table.fips_codes(label) == set(line[0] for line in members)
+        assert table.total_population(label) == total
+        assert table.horiz_center(label) == approx(sum(line[1] * line[3] for line in members) / float(total))
+        assert table.vert_center(label) == approx(sum(line[2] * line[3] for line in members) / float(total))
+        assert table.averaged_risk(label) == approx(sum(line[4] * line[3] for line in members) / float(total))
+
+    # again, on the merged table
+    table.merge_groups([5, 5, 5])
+    assert len(table) == 1
+    assert table.fips_codes(0) == set(line[0] for line in cancer_24)
+
+
+def tree_heights(table):
+    """Height of the union-find tree of every live cluster, by slot"""
+    depths = {}
+    for row in range(len(table._parent)):
+        depth, node = 0, row
+        while table._parent[node] != node:
+            node = table._parent[node]
+            depth += 1
+        depths[node] = max(depths.get(node, 0), depth)
+    return dict((idx, depths[table._root[idx]]) for idx in table.indexes())
+
+
+def test_merge_groups_rank(cancer_24):
+    # merge_groups and merge mixed, ranks still bound the tree heights
+    table = ClusterTable.from_data_table(cancer_24)
+    table.merge(0, 1).merge(0, 2).merge(3, 4)
+    labels = [idx % 4 for idx in range(len(table))]
+    table.merge_groups(labels)
+    for idx_u, idx_v in zip(table.indexes()[:2], table.indexes()[2:]):
+        table.merge(idx_u, idx_v)
+    table.merge_groups([0] * len(table))
+
+    for idx, height in tree_heights(table).items():
+        assert height <= table._rank[table._root[idx]]
+    assert table.fips_codes(0) == set(line[0] for line in cancer_24)
+
+
+def test_memberships(cancer_24):
+    table = ClusterTable.from_data_table(cancer_24)
+    table.merge(3, 1)
+    table.merge(3, 7)
+    offsets, rows = table.memberships()
+    assert len(offsets) == len(table) + 1
+    assert sorted(rows) == list(range(24))
+
+    pos = list(table.indexes()).index(3)
+    assert sorted(rows[offsets[pos]:offsets[pos+1]]) == [1, 3, 7]
+
+
+def test_copy(cancer_24):
+    table = ClusterTable.from_data_table(cancer_24)
+    other = table.copy()
+    other.merge(0, 1)
+
+    assert len(table) == 24
+    assert len(other) == 23
+    assert table.fips_codes(0) == set([cancer_24[0][0]])
+    assert table.horiz_center(0) == cancer_24[0][1]
+
+
+def test_distances(cancer_24):
+    table = ClusterTable.from_data_table(cancer_24)
+    clusters = singletons(cancer_24)
+    table.merge(0, 1)
+    clusters[0].merge_clusters(clusters[1])
+
+    dists = table.distances(0)
+    assert dists[1] == float('inf')
+    for idx in range(2, 24):
+        assert dists[idx] == clusters[0].distance(clusters[idx])
+        assert table.distance(0, idx) == clusters[0].distance(clusters[idx])
+
+
+def test_memory(cancer_24):
+    clusters = singletons(cancer_24)
+    table = ClusterTable.from_clusters(clusters)
+    obj_bytes = sum(sys.getsizeof(c) + sys.getsizeof(vars(c)) + sys.getsizeof(c.fips_codes())
+                    for c in clusters)
+    assert table.nbytes() * 10 < obj_bytes
@@ -0,0 +1,101 @@
+import pytest
+import random
+import sys
+import numpy as np
+from ..csr_graph import CSRGraph, bfs_visited, cc_visited, largest_cc_size
+from ..csr_graph import compute_in_degrees, in_degree_distribution, component_labels
+from .. import cc_gr, graph_degree
+from ..graph_gen import algo_er, algo_upa, algo_dpa
+
+
+@pytest.fixture
+def ugraph():
+    return {
+        0: set([1, 2]),
+        1: set([0, 2]),
+        2: set([0, 1]),
+        3: set([4, 5]),
+        4: set([3, 5]),
+        5: set([3, 4]),
+        6: set([7]),
+        7: set([6]),
+        8: set(),
+    }
+
+
+def test_from_dict_round_trip(ugraph):
+    graph = CSRGraph.from_dict(ugraph)
+    assert len(graph) == 9
+    assert graph.num_edges() == 14
+    assert graph.to_dict() == ugraph
+    assert list(graph.neighbors_of(3)) == [4, 5]
+    assert list(graph.degrees()) == [2, 2, 2, 2, 2, 2, 1, 1, 0]
+
+    for digraph in [graph_degree.EX_GRAPH0, graph_degree.EX_GRAPH1, graph_degree.EX_GRAPH2, {}]:
+        assert CSRGraph.from_dict(digraph).to_dict() == digraph
+
+
+def test_from_dict_labels():
+    digraph = {10: set([30, 20]), 20: set([99]), 30: set()}
+    graph = CSRGraph.from_dict(digraph)
+    assert list(graph.labels) == [10, 20, 30, 99]
+    assert graph.index(99) == 3
+    with pytest.raises(KeyError):
+        graph.index(15)
+    expected = dict(digraph)
+    expected[99] = set()
+    assert graph.to_dict() == expected
+
+
+def test_from_edges():
+    graph = CSRGraph.from_edges([0, 2, 0, 2], [1, 1, 1, 3], 5, undirected=True)
+    assert graph.to_dict() == {0: set([1]), 1: set([0, 2]), 2: set([1, 3]), 3: set([2]), 4: set()}
+    sources, targets = graph.edges()
+    assert CSRGraph.from_edges(sources, targets, 5).to_dict() == graph.to_dict()
+    assert graph.neighbors.dtype == np.int32
+
+    other = graph.copy()
+    other.neighbors[0] = 4
+    assert graph.neighbors[0] == 1
+
+
+def test_bfs_visited(ugraph):
+    graph = CSRGraph.from_dict(ugraph)
+    for node in ugraph:
+        assert bfs_visited(graph, node) == cc_gr.bfs_visited(ugraph, node)
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_cc_visited(ugraph, seed):
+    random.seed(seed)
+    for dict_graph in [ugraph, algo_er(200, 0.006), algo_upa(100, 2), {}, {0: set()}]:
+        graph = CSRGraph.from_dict(dict_graph)
+        ccs = cc_visited(graph)
+        expected = cc_gr.cc_visited(dict_graph)
+        assert sorted(map(sorted, ccs)) == sorted(map(sorted, expected))
+        assert largest_cc_size(graph) == cc_gr.largest_cc_size(dict_graph)
+
+
+def test_component_labels_path():
+    # a long path, labels have to travel the whole way
+    num = 5000
+    order = np.random.RandomState(0).permutation(num)
+    graph = CSRGraph.from_edges(order[:-1], order[1:], num, undirected=True)
+    assert (component_labels(graph) == 0).all()
+
+
+def test_in_degrees():
+    random.seed(1)
+    for digraph in [graph_degree.EX_GRAPH0, graph_degree.EX_GRAPH1, graph_degree.EX_GRAPH2, algo_dpa(300, 4), {}]:
+        graph = CSRGraph.from_dict(digraph)
+        in_degrees = compute_in_degrees(graph)
+        assert dict(zip(graph.labels.tolist(), in_degrees.tolist())) == graph_degree.compute_in_degrees(digraph)
+        assert in_degree_distribution(graph) == graph_degree.in_degree_distribution(digraph)
+
+
+def test_memory():
+    random.seed(2)
+    dict_graph = algo_upa(2000, 5)
+    graph = CSRGraph.from_dict(dict_graph)
+    dict_bytes = sys.getsizeof(dict_graph) + sum(sys.getsizeof(neighs) for neighs in dict_graph.values())
+    assert graph.nbytes() * 10 < dict_bytes
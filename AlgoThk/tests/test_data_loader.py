@@ -0,0 +1,165 @@
+import pytest
+import os
+import shutil
+import numpy as np
+from ..data_loader import load_cancer_table, iter_cancer_chunks, table_rows, CANCER_FIELDS
+from ..data_loader import load_graph, iter_graph_chunks, graph_cache_urls
+from ..csr_graph import CSRGraph
+from ..cluster_table import ClusterTable
+from .test_pair import load_data_table
+
+
+DATA_URLS = [
+    r'AlgoThk/data/unifiedCancerData_24.csv',
+    r'AlgoThk/data/unifiedCancerData_111.csv',
+    r'AlgoThk/data/unifiedCancerData_3108.csv',
+]
+
+
+@pytest.mark.parametrize('data_url', DATA_URLS)
+def test_load_cancer_table(data_url):
+    expected = load_data_table(data_url)
+    table = load_cancer_table(data_url)
+
+    assert table.dtype.names == CANCER_FIELDS
+    assert len(table) == len(expected)
+    assert table_rows(table) == expected
+    for record, line in zip(table, expected):
+        assert record[0] == line[0]
+        assert record[3] == line[3]
+
+
+def test_iter_cancer_chunks():
+    data_url = DATA_URLS[0]
+    chunks = list(iter_cancer_chunks(data_url, chunk_lines=7))
+    assert [len(chunk) for chunk in chunks] == [7, 7, 7, 3]
+    assert sum((table_rows(chunk) for chunk in chunks), []) == load_data_table(data_url)
+
+
+def test_load_cancer_table_small_chunks():
+    data_url = DATA_URLS[1]
+    assert table_rows(load_cancer_table(data_url, chunk_lines=10)) == load_data_table(data_url)
+
+
+def test_load_cancer_table_cache(tmpdir):
+    data_url = str(tmpdir.join('data.csv'))
+    shutil.copy(DATA_URLS[1], data_url)
+
+    table = load_cancer_table(data_url, cache=True)
+    assert os.path.exists(data_url + '.npy')
+    assert table_rows(table) == load_data_table(DATA_URLS[1])
+
+    # loaded from the cache file now
+    cached = load_cancer_table(data_url, cache=True)
+    assert cached.filename is not None
+    assert table_rows(cached) == table_rows(table)
+
+    # a newer csv file outdates the cache
+    with open(data_url, 'a') as data_file:
+        data_file.write('\n99999, 1.0, 2.0, 3, 4e-05\n')
+    os.utime(data_url, (os.path.getmtime(data_url + '.npy') + 10,) * 2)
+    assert len(load_cancer_table(data_url, cache=True)) == 112
+
+
+def test_load_cancer_table_cache_failed(tmpdir):
+    data_url = str(tmpdir.join('data.csv'))
+    with open(DATA_URLS[0]) as data_file:
+        lines = data_file.read().strip().split('\n')[:6]
+    lines[-1] = lines[-1].replace(lines[-1].split(',')[3], ' many')
+    with open(data_url, 'w') as data_file:
+        data_file.write('\n'.join(lines))
+
+    # the failed parse is not cached as a table of zeros
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            load_cancer_table(data_url, cache=True)
+    assert os.listdir(str(tmpdir)) == ['data.csv']
+
+
+GRAPH_URLS = [
+    r'AlgoThk/data/alg_rf7.txt',
+    r'AlgoThk/data/alg_phys-cite.txt',
+]
+
+
+def load_graph_dict(data_url):
+    """dict of sets read line by line, as citation_graph.ipynb does"""
+    graph = {}
+    with open(data_url) as data_file:
+        for line in data_file:
+            cit_lst = [int(item) for item in line.split()]
+            if cit_lst:
+                graph[cit_lst[0]] = graph.get(cit_lst[0], set()).union(cit_lst[1:])
+    return graph
+
+
+def assert_same_graph(graph, expected):
+    assert np.array_equal(graph.offsets, expected.offsets)
+    assert np.array_equal(graph.neighbors, expected.neighbors)
+    assert np.array_equal(graph.labels, expected.labels)
+
+
+@pytest.mark.parametrize('data_url', GRAPH_URLS)
+def test_load_graph(data_url):
+    expected = load_graph_dict(data_url)
+    graph = load_graph(data_url)
+    assert_same_graph(graph, CSRGraph.from_dict(expected))
+    assert graph.to_dict() == expected
+
+
+def test_load_graph_small_chunks(tmpdir):
+    # repeated node lines add up, blank lines and unknown neighbors are kept apart
+    data_url = str(tmpdir.join('graph.txt'))
+    with open(data_url, 'w') as data_file:
+        data_file.write('3 1 7\n1 3\n\n3 1 5 \n9\n')
+
+    chunks = list(iter_graph_chunks(data_url, chunk_lines=2))
+    assert [chunk[0].tolist() for chunk in chunks] == [[3, 1], [3], [9]]
+    assert [chunk[1].tolist() for chunk in chunks] == [[2, 1], [2], [0]]
+    assert [chunk[2].tolist() for chunk in chunks] == [[1, 7, 3], [1, 5], []]
+
+    graph = load_graph(data_url, chunk_lines=2)
+    assert graph.to_dict() == {1: set([3]), 3: set([1, 5, 7]), 5: set(), 7: set(), 9: set()}
+
+
+def test_load_graph_cache(tmpdir):
+    data_url = str(tmpdir.join('graph.txt'))
+    shutil.copy(GRAPH_URLS[0], data_url)
+    expected = load_graph(GRAPH_URLS[0])
+
+    graph = load_graph(data_url, cache=True)
+    cache_urls = graph_cache_urls(data_url)
+    assert all(os.path.exists(url) for url in cache_urls.values())
+    assert_same_graph(graph, expected)
+
+    # loaded from the cache files now
+    cached = load_graph(data_url, cache=True)
+    assert isinstance(cached.neighbors.base, np.memmap)
+    assert_same_graph(cached, expected)
+
+    # other contents, other cache files
+    with open(data_url, 'a') as data_file:
+        data_file.write('5000 0\n')
+    assert graph_cache_urls(data_url) != cache_urls
+    changed = load_graph(data_url, cache=True)
+    assert len(changed) == len(expected) + 1
+    assert changed.to_dict()[5000] == set([0])
+
+
+def test_load_graph_cache_dir(tmpdir):
+    cache_dir = str(tmpdir.mkdir('cache'))
+    graph = load_graph(GRAPH_URLS[0], cache=True, cache_dir=cache_dir)
+    assert sorted(os.listdir(cache_dir)) == sorted(os.path.basename(url)
+                                                   for url in graph_cache_urls(GRAPH_URLS[0], cache_dir).values())
+    assert_same_graph(graph, load_graph(GRAPH_URLS[0]))
+
+
+def test_cluster_table_from_records():
+    data_url = DATA_URLS[0]
+    table = ClusterTable.from_records(load_cancer_table(data_url))
+    expected = ClusterTable.from_data_table(load_data_table(data_url))
+    assert len(table) == 24
+    for idx in range(24):
+        assert table.fips_codes(idx) == expected.fips_codes(idx)
+        assert table.horiz_center(idx) == expected.horiz_center(idx)
+        assert table.total_population(idx) == expected.total_population(idx)
@@ -1,6 +1,12 @@
 import pytest
+import random
+import numpy as np
+from pytest import approx
 from ..graph_degree import EX_GRAPH0, EX_GRAPH1, EX_GRAPH2
 from ..graph_degree import compute_in_degrees, in_degree_distribution
+from ..graph_degree import fast_in_degree_distribution, degree_distribution
+from ..graph_degree import normalized_distribution, log_binned_distribution
+from ..graph_gen import algo_dpa
 
 
 @pytest.fixture
@@ -34,3 +40,35 @@ def test_in_degree_distribution2(graph2):
     assert dist[1] == 5
     assert dist[2] == 2
 
+
+@pytest.mark.parametrize('graph', [EX_GRAPH0, EX_GRAPH1, EX_GRAPH2, {}, {0: set(), 1: set()},
+                                   {10: set([20, 30]), 20: set([30, 40])}])
+def test_fast_in_degree_distribution(graph):
+    assert fast_in_degree_distribution(graph) == in_degree_distribution(graph)
+
+
+def test_fast_in_degree_distribution_random():
+    random.seed(4)
+    graph = algo_dpa(500, 5)
+    assert fast_in_degree_distribution(graph) == in_degree_distribution(graph)
+    assert degree_distribution(list(compute_in_degrees(graph).values())) == in_degree_distribution(graph)
+
+
+def test_normalized_distribution():
+    pmf = normalized_distribution(in_degree_distribution(EX_GRAPH1))
+    assert pmf == {1: 5 / 7.0, 2: 2 / 7.0}
+    assert sum(pmf.values()) == approx(1)
+
+
+def test_log_binned_distribution():
+    dist = {0: 10, 1: 40, 2: 20, 3: 10, 10: 5, 11: 5, 100: 10}
+    centers, density = log_binned_distribution(dist, bins_per_decade=1)
+    assert len(centers) == len(density) == 3
+    assert list(centers) == sorted(centers)
+    # mass of every bin adds up to the nodes with degree > 0
+    edges = np.logspace(0, np.log10(101), 4)
+    widths = np.diff(edges)
+    assert (density * widths).sum() == approx(90 / 100.0)
+    assert density[0] * widths[0] == approx(70 / 100.0)
+
+    assert [len(arr) for arr in log_binned_distribution({0: 3})] == [0, 0]
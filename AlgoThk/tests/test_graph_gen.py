@@ -1,5 +1,9 @@
 import pytest
+import random
+import numpy as np
 from ..graph_gen import make_complete_graph, algo_er, AlgoDPA, AlgoUPA
+from ..graph_gen import fast_algo_dpa, fast_algo_upa, fast_algo_er, _triangle_pairs
+from ..csr_graph import CSRGraph
 
 
 def test_make_complete_graph():
@@ -110,3 +114,109 @@ def test_upa_update_graph():
     assert len(upa._graph) == 3
     assert 2 in upa._graph[0]
     assert upa._graph[2] == set([0])
+
+
+@pytest.mark.parametrize('num_nodes, init_nodes', [(0, 0), (5, 0), (6, 1), (2, 3), (300, 5)])
+def test_fast_dpa_shape(num_nodes, init_nodes):
+    graph = fast_algo_dpa(num_nodes, init_nodes, seed=1, as_dict=True)
+    assert len(graph) == max(num_nodes, init_nodes)
+    for node in range(init_nodes):
+        assert graph[node] == set(range(init_nodes)) - set([node])
+    for node in range(init_nodes, num_nodes):
+        # edges only to older nodes, at most init_nodes draws
+        assert 1 <= len(graph[node]) <= init_nodes or init_nodes == 0
+        assert all(neigh < node for neigh in graph[node])
+
+
+@pytest.mark.parametrize('num_nodes, init_nodes', [(0, 0), (5, 0), (6, 1), (2, 3), (300, 5)])
+def test_fast_upa_shape(num_nodes, init_nodes):
+    graph = fast_algo_upa(num_nodes, init_nodes, seed=1, as_dict=True)
+    assert len(graph) == max(num_nodes, init_nodes)
+    for node, neighs in graph.items():
+        assert node not in neighs
+        for neigh in neighs:
+            assert node in graph[neigh]
+    for node in range(init_nodes, num_nodes):
+        older = [neigh for neigh in graph[node] if neigh < node]
+        assert 1 <= len(older) <= init_nodes or init_nodes == 0
+
+
+def test_fast_dpa_seed():
+    graph = fast_algo_dpa(2000, 4, seed=3)
+    assert isinstance(graph, CSRGraph)
+    same = fast_algo_dpa(2000, 4, seed=3)
+    assert np.array_equal(graph.offsets, same.offsets)
+    assert np.array_equal(graph.neighbors, same.neighbors)
+    assert fast_algo_dpa(2000, 4, seed=3, as_dict=True) == graph.to_dict()
+    assert fast_algo_dpa(2000, 4, seed=4, as_dict=True) != graph.to_dict()
+
+
+def test_fast_dpa_weights():
+    # weighted choice list [0], then [0, 1, 0]: node 2 picks 0 with p = 2/3
+    picks = [fast_algo_dpa(3, 1, seed=seed, as_dict=True)[2] == set([0]) for seed in range(3000)]
+    assert np.mean(picks) == pytest.approx(2 / 3.0, abs=0.03)
+
+
+def test_fast_upa_weights():
+    # weighted choice list [0], then [0, 1, 1, 0]: node 2 picks 0 with p = 1/2
+    picks = [fast_algo_upa(3, 1, seed=seed, as_dict=True)[2] == set([0]) for seed in range(3000)]
+    assert np.mean(picks) == pytest.approx(0.5, abs=0.03)
+
+
+def test_fast_dpa_like_dpa():
+    # in-degree of a first node and draws of the last, against algo_dpa
+    fast = [fast_algo_dpa(40, 4, seed=seed, as_dict=True) for seed in range(500)]
+    random.seed(0)
+    slow = [AlgoDPA(40, 4).generate_graph() for _ in range(500)]
+    for graphs in (fast, slow):
+        in_zero = np.mean([sum(0 in neighs for neighs in graph.values()) for graph in graphs])
+        last = np.mean([len(graph[39]) for graph in graphs])
+        assert in_zero == pytest.approx(21.4, abs=1.0)
+        assert last == pytest.approx(3.52, abs=0.1)
+
+
+def test_triangle_pairs():
+    rows, cols = _triangle_pairs(np.arange(10))
+    assert zip(rows, cols) == [(1, 0), (2, 0), (2, 1), (3, 0), (3, 1), (3, 2), (4, 0), (4, 1), (4, 2), (4, 3)]
+
+    # last pairs of 10^6 nodes, past the float precision of the sqrt
+    num = 10 ** 6
+    last = num * (num - 1) // 2
+    rows, cols = _triangle_pairs(np.array([last - 1, last - 2, last - num + 1]))
+    assert rows.tolist() == [num - 1, num - 1, num - 1]
+    assert cols.tolist() == [num - 2, num - 3, 0]
+
+
+@pytest.mark.parametrize('prob', [0, 1])
+def test_fast_algo_er_like_algo_er(prob):
+    assert fast_algo_er(10, prob, as_dict=True) == algo_er(10, prob)
+    assert fast_algo_er(0, prob, as_dict=True) == {}
+    assert fast_algo_er(1, prob, as_dict=True) == {0: set()}
+
+
+def test_fast_algo_er_seed():
+    graph = fast_algo_er(1000, 0.01, seed=5)
+    assert isinstance(graph, CSRGraph)
+    assert len(graph) == 1000
+    assert fast_algo_er(1000, 0.01, seed=5, as_dict=True) == graph.to_dict()
+    assert fast_algo_er(1000, 0.01, seed=6, as_dict=True) != graph.to_dict()
+
+
+def test_fast_algo_er_pairs():
+    # every pair is an edge with probability prob
+    num, prob, trials = 8, 0.3, 2000
+    counts = np.zeros((num, num))
+    for seed in range(trials):
+        for node, neighs in fast_algo_er(num, prob, seed=seed, as_dict=True).items():
+            assert node not in neighs
+            counts[node, list(neighs)] += 1
+    assert np.array_equal(counts, counts.T)
+    off_diagonal = counts[~np.eye(num, dtype=bool)] / trials
+    assert np.allclose(off_diagonal, prob, atol=0.05)
+
+
+def test_fast_algo_er_sparse():
+    num, prob = 10 ** 5, 10 ** -4
+    graph = fast_algo_er(num, prob, seed=0)
+    expected = num * (num - 1) / 2 * prob
+    assert graph.num_edges() / 2 == pytest.approx(expected, abs=5 * expected ** 0.5)
@@ -1,9 +1,15 @@
 import pytest
 import math
 import random
+import numpy as np
 from pytest import approx
 from ..pair import create_dummy_clusters, slow_closest_pair, fast_closest_pair, closest_pair_strip
-from ..pair import hierarchical_clustering, kmeans_clustering
+from ..pair import hierarchical_clustering, kmeans_clustering, fast_hierarchical_clustering
+from ..pair import fast_kmeans_clustering, _kmeans_arrays
+from ..pair import compute_distortion, compute_cluster_errors, build_fips_index
+from ..pair import hierarchical_distortion_curve, minibatch_kmeans_clustering
+from ..data_loader import load_cancer_table, iter_cancer_chunks
+from ..pair import array_closest_pair, closest_pair_arrays
 from ..alg_cluster import Cluster
 
 
@@ -97,6 +103,46 @@ def test_fast_closest_pair_random():
         ) <= 1e-4
 
 
+@pytest.mark.parametrize('ps_case', ['ps_case1', 'ps_case2', 'ps_case3'])
+def test_array_closest_pair(ps_case, request):
+    _ps_case = request.getfixturevalue(ps_case)
+    ps = _ps_case['clusters']
+    expected = _ps_case['expected']
+
+    min_dist, u, v = array_closest_pair(ps)
+    assert min_dist == expected[0]
+    assert u in expected[1]
+    assert v in expected[1]
+    assert u < v
+
+
+def test_array_closest_pair_empties():
+    assert array_closest_pair([]) == (float('inf'), -1, -1)
+    assert closest_pair_arrays([1.0], [2.0]) == (float('inf'), -1, -1)
+
+
+def test_array_closest_pair_random():
+    # unsorted input, sizes around the brute force leaf size
+    M = 10
+    for n in [2, 3, 63, 64, 65, 128, 129, 500, 2000]:
+        points = [(random.random()*M, random.random()*M) for _ in range(n)]
+        clusters = create_dummy_clusters(points)
+        res_slow = slow_closest_pair(clusters)
+        res_arr = array_closest_pair(clusters)
+
+        assert res_arr[1] < res_arr[2]
+        assert clusters[res_arr[1]].distance(clusters[res_arr[2]]) == approx(res_arr[0])
+        assert res_slow[0] == approx(res_arr[0])
+
+
+def test_array_closest_pair_same_x():
+    # a vertical line puts every point on the split
+    points = [(1.0, y * 1.5) for y in range(100)] + [(1.0, 20.2)]
+    res = closest_pair_arrays([p[0] for p in points], [p[1] for p in points])
+    assert res[0] == approx(0.7)
+    assert res[1:] == (13, 100)
+
+
 def test_closest_pair_strip():
     points = [(4,4),(5,0),(5.9,2),(6.1,2),(6.5,4),(7,6),(8,1)]
     clusters = create_dummy_clusters(points)
@@ -184,6 +230,33 @@ def test_hiercluster2(data, k, expected, request):
     assert set_of_county_tuples(hcs) == expected
 
 
+@pytest.mark.parametrize(
+    'data_url, ks',
+    [
+        [r'AlgoThk/data/unifiedCancerData_24.csv', range(1, 24)],
+        [r'AlgoThk/data/unifiedCancerData_111.csv', [100, 50, 20, 15, 9]],
+        [r'AlgoThk/data/unifiedCancerData_290.csv', [15]],
+    ]
+)
+def test_fast_hiercluster_same(data_url, ks):
+    data = load_data_table(data_url)
+    for k in ks:
+        clusters = [Cluster(set([d[0]]), *d[1:]) for d in data]
+        expected = set_of_county_tuples(hierarchical_clustering(clusters, k))
+
+        clusters = [Cluster(set([d[0]]), *d[1:]) for d in data]
+        fast = fast_hierarchical_clustering(clusters, k)
+        assert fast is clusters
+        assert len(fast) == k
+        assert set_of_county_tuples(fast) == expected
+
+
+def test_fast_hiercluster_less():
+    clusters = create_dummy_clusters([(1, 1), (2, 2)])
+    assert len(fast_hierarchical_clustering(clusters, 4)) == 2
+    assert fast_hierarchical_clustering([], 4) == []
+
+
 def test_hiercluster(clusters_case1):
     clusters = clusters_case1
     orig_num = len(clusters)
@@ -249,3 +322,175 @@ def test_kmeans2(data, num_k, num_iter, expected, request):
     cluster = request.getfixturevalue(data)
     kmeans = kmeans_clustering(cluster, num_k, num_iter)
     assert set_of_county_tuples(kmeans) == expected
+
+
+@pytest.mark.parametrize(
+    'data_url, num_k, num_iter',
+    [
+        [r'AlgoThk/data/unifiedCancerData_24.csv', 15, 1],
+        [r'AlgoThk/data/unifiedCancerData_24.csv', 10, 3],
+        [r'AlgoThk/data/unifiedCancerData_24.csv', 5, 5],
+        [r'AlgoThk/data/unifiedCancerData_111.csv', 9, 5],
+        [r'AlgoThk/data/unifiedCancerData_290.csv', 15, 5],
+        [r'AlgoThk/data/unifiedCancerData_896.csv', 20, 5],
+    ]
+)
+def test_fast_kmeans_same(data_url, num_k, num_iter):
+    data = load_data_table(data_url)
+    clusters = [Cluster(set([d[0]]), *d[1:]) for d in data]
+    expected = kmeans_clustering(clusters, num_k, num_iter)
+    fast = fast_kmeans_clustering(clusters, num_k, num_iter)
+
+    assert set_of_county_tuples(fast) == set_of_county_tuples(expected)
+    centers = sorted((c.horiz_center(), c.vert_center(), c.total_population(), c.averaged_risk()) for c in fast)
+    expected = sorted((c.horiz_center(), c.vert_center(), c.total_population(), c.averaged_risk()) for c in expected)
+    for ctr, exp in zip(centers, expected):
+        assert ctr == approx(exp)
+
+
+def test_fast_kmeans_norun(clusters_case1):
+    assert fast_kmeans_clustering([], 2, 10) == []
+    assert fast_kmeans_clustering(clusters_case1, 4, 0) is clusters_case1
+
+
+def test_fast_kmeans_empty_center():
+    # both initial centers sit on the same spot, the second one gets nothing
+    clusters = create_dummy_clusters([(5, 5), (0, 0), (0, 0)])
+    kmeans = fast_kmeans_clustering(clusters, 2, 1)
+    assert [len(c.fips_codes()) for c in kmeans] == [3, 0]
+    assert [c.total_population() for c in kmeans] == [30, 0]
+    assert (kmeans[1].horiz_center(), kmeans[1].vert_center()) == (0, 0)
+    assert set_of_county_tuples(kmeans) == set_of_county_tuples(kmeans_clustering(clusters, 2, 1))
+
+
+@pytest.mark.parametrize('num_k', [1, 2, 15, 100, 400])
+def test_kmeans_hamerly_same(num_k):
+    rand = np.random.RandomState(num_k)
+    horiz, vert = rand.rand(2000), rand.rand(2000)
+    weights = rand.randint(1, 100, 2000).astype(float)
+    inits = rand.choice(2000, num_k, replace=False)
+    brute = _kmeans_arrays(horiz, vert, weights, horiz[inits], vert[inits], 10, 'brute')
+    hamerly = _kmeans_arrays(horiz, vert, weights, horiz[inits], vert[inits], 10, 'hamerly')
+    assert (brute[0] == hamerly[0]).all()
+    assert (brute[1] == hamerly[1]).all()
+    assert (brute[2] == hamerly[2]).all()
+
+
+def test_fast_kmeans_hamerly():
+    data = load_data_table(r'AlgoThk/data/unifiedCancerData_896.csv')
+    clusters = [Cluster(set([d[0]]), *d[1:]) for d in data]
+    expected = fast_kmeans_clustering(clusters, 50, 10)
+    hamerly = fast_kmeans_clustering(clusters, 50, 10, assign='hamerly')
+    assert set_of_county_tuples(hamerly) == set_of_county_tuples(expected)
+
+    with pytest.raises(ValueError, match='kdtree'):
+        fast_kmeans_clustering(clusters, 50, 10, assign='kdtree')
+    # checked before the early return of small inputs
+    with pytest.raises(ValueError):
+        fast_kmeans_clustering(clusters[:3], 50, 10, assign='kdtree')
+
+
+def test_fast_kmeans_seed():
+    data = load_data_table(r'AlgoThk/data/unifiedCancerData_290.csv')
+    clusters = [Cluster(set([d[0]]), *d[1:]) for d in data]
+    first = fast_kmeans_clustering(clusters, 15, 5, seed=3)
+    assert set_of_county_tuples(first) == set_of_county_tuples(fast_kmeans_clustering(clusters, 15, 5, seed=3))
+    assert len(first) == 15
+    assert sum(len(c.fips_codes()) for c in first) == 290
+
+
+def test_compute_distortion():
+    # values given by the course for the 111 counties table
+    data = load_data_table(r'AlgoThk/data/unifiedCancerData_111.csv')
+    hcs = fast_hierarchical_clustering([Cluster(set([d[0]]), *d[1:]) for d in data], 9)
+    kms = kmeans_clustering([Cluster(set([d[0]]), *d[1:]) for d in data], 9, 5)
+    assert compute_distortion(hcs, data) == approx(1.752e11, rel=1e-3)
+    assert compute_distortion(kms, data) == approx(2.712e11, rel=1e-3)
+
+
+def test_compute_cluster_errors():
+    data = load_data_table(r'AlgoThk/data/unifiedCancerData_290.csv')
+    index = build_fips_index(data)
+    clusters = fast_kmeans_clustering([Cluster(set([d[0]]), *d[1:]) for d in data], 20, 3)
+    clusters.append(Cluster(set(), 0, 0, 0, 0))
+
+    errors = compute_cluster_errors(clusters, data, index)
+    assert len(errors) == 21
+    assert errors[-1] == 0
+    for cluster, error in zip(clusters, errors):
+        assert error == approx(cluster.cluster_error(data))
+        assert error == approx(cluster.cluster_error(data, index))
+    assert compute_distortion(clusters, data) == approx(sum(errors))
+    assert compute_distortion(clusters, data, index) == approx(sum(errors))
+
+
+def test_hierarchical_distortion_curve():
+    data = load_data_table(r'AlgoThk/data/unifiedCancerData_290.csv')
+    clusters = [Cluster(set([d[0]]), *d[1:]) for d in data]
+    ks = list(range(6, 21)) + [290, 300]
+    curve = hierarchical_distortion_curve(clusters, data, ks)
+
+    # not mutated
+    assert len(clusters) == 290
+    assert all(len(c.fips_codes()) == 1 for c in clusters)
+
+    assert sorted(curve) == sorted(ks)
+    for k in ks:
+        hcs = fast_hierarchical_clustering([c.copy() for c in clusters], k)
+        snap, distortion = curve[k]
+        assert len(snap) == min(k, 290)
+        assert set_of_county_tuples(snap) == set_of_county_tuples(hcs)
+        assert distortion == approx(compute_distortion(hcs, data), rel=1e-9)
+
+
+def test_hierarchical_distortion_curve_empty():
+    clusters = create_dummy_clusters([(0, 0), (1, 1)])
+    data = [[0, 0, 0, 10, 10], [1, 1, 1, 10, 10]]
+    assert hierarchical_distortion_curve(clusters, data, []) == {}
+    assert hierarchical_distortion_curve([], [], [2]) == {2: ([], 0)}
+
+
+@pytest.mark.parametrize('num_k, num_iter', [(15, 1), (9, 5), (20, 3)])
+def test_minibatch_kmeans_one_batch(num_k, num_iter):
+    # a single batch is the plain weighted k-means
+    data_url = r'AlgoThk/data/unifiedCancerData_896.csv'
+    data = load_data_table(data_url)
+    records = load_cancer_table(data_url)
+    expected = fast_kmeans_clustering([Cluster(set([d[0]]), *d[1:]) for d in data], num_k, num_iter)
+    minibatch = minibatch_kmeans_clustering(records, num_k, num_iter, batch_size=len(records), keep_fips=True)
+
+    assert set_of_county_tuples(minibatch) == set_of_county_tuples(expected)
+    for cluster, other in zip(minibatch, expected):
+        assert cluster.horiz_center() == approx(other.horiz_center())
+        assert cluster.vert_center() == approx(other.vert_center())
+        assert cluster.total_population() == other.total_population()
+        assert cluster.averaged_risk() == approx(other.averaged_risk())
+
+
+def test_minibatch_kmeans_batches():
+    data_url = r'AlgoThk/data/unifiedCancerData_3108.csv'
+    data = load_data_table(data_url)
+    records = load_cancer_table(data_url)
+    full = fast_kmeans_clustering([Cluster(set([d[0]]), *d[1:]) for d in data], 15, 5)
+    minibatch = minibatch_kmeans_clustering(records, 15, 5, batch_size=500, keep_fips=True)
+
+    assert len(minibatch) == 15
+    assert sum(c.total_population() for c in minibatch) == sum(d[3] for d in data)
+    assert sum(len(c.fips_codes()) for c in minibatch) == 3108
+    assert compute_distortion(minibatch, data) < 1.5 * compute_distortion(full, data)
+
+    # same result from a stream of chunks, without fips codes
+    streamed = minibatch_kmeans_clustering(lambda: iter_cancer_chunks(data_url, chunk_lines=500), 15, 5)
+    for cluster, other in zip(streamed, minibatch):
+        assert cluster.fips_codes() == set()
+        assert cluster.horiz_center() == other.horiz_center()
+        assert cluster.total_population() == other.total_population()
+
+
+def test_minibatch_kmeans_small_batch():
+    records = load_cancer_table(r'AlgoThk/data/unifiedCancerData_24.csv')
+    minibatch = minibatch_kmeans_clustering(records, 15, 1, batch_size=4)
+    assert len(minibatch) == 15
+    assert sum(c.total_population() for c in minibatch) == sum(records['population'])
+    with pytest.raises(ValueError):
+        minibatch_kmeans_clustering(records[:10], 15, 1)
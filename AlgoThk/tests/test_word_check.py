@@ -0,0 +1,66 @@
+import pytest
+import random
+from ..alignment import build_scoring_matrix
+from ..word_check import WordChecker, edit_distance
+
+
+@pytest.fixture
+def words():
+    rand = random.Random(3)
+    words = set(['humble', 'humbled', 'bumble', 'tumble', 'humbly', 'fumble', 'firefly', 'fireplug', 'a', ''])
+    for _ in range(1000):
+        words.add(''.join(rand.choice('abcdefhilmu') for _ in range(rand.randint(1, 8))))
+    return words
+
+
+def test_edit_distance():
+    scores = build_scoring_matrix(set('abcdefghijklmnopqrstuvwxyz'), 2, 1, 0)
+    assert edit_distance('humble', 'humble', scores) == 0
+    assert edit_distance('humble', 'bumble', scores) == 1
+    assert edit_distance('humble', 'humbled', scores) == 1
+    assert edit_distance('kitten', 'sitting', scores) == 3
+    assert edit_distance('', 'abc', scores) == 3
+
+
+@pytest.mark.parametrize('query, dist', [('humble', 1), ('firefly', 2), ('hum', 2), ('', 1), ('zzz', 3)])
+def test_check(words, query, dist):
+    checker = WordChecker(words)
+    expected = {}
+    for word in words:
+        word_dist = edit_distance(query, word, checker.scores)
+        if word_dist <= dist:
+            expected[word] = word_dist
+    assert checker.check(query, dist) == expected
+
+
+def test_check_scores(words):
+    # substitutions cost 2, like a deletion plus an insertion
+    scores = build_scoring_matrix(set(''.join(words)), 2, 0, 0)
+    checker = WordChecker(words, scores)
+    expected = dict((word, edit_distance('humble', word, scores)) for word in words)
+    expected = dict((word, word_dist) for word, word_dist in expected.items() if word_dist <= 2)
+    assert checker.check('humble', 2) == expected
+    assert 'bumble' in expected and 'humbled' in expected
+
+    with pytest.raises(ValueError):
+        WordChecker(words, build_scoring_matrix(set(''.join(words)), 3, 1, 0))
+
+
+def test_contains(words):
+    checker = WordChecker(words)
+    assert len(checker) == len(words)
+    assert 'humble' in checker
+    assert '' in checker
+    assert 'humbl' not in checker
+    assert WordChecker(['ab']).check('', 1) == {}
+
+
+def test_check_unknown_letters():
+    checker = WordChecker(['dont', 'ab', 'abc'])
+    assert checker.check("don't", 1) == {'dont': 1}
+    assert checker.check('ab1', 1) == {'ab': 1, 'abc': 1}
+    assert checker.check('1', 0) == {}
+
+    checker = WordChecker(['dont'], build_scoring_matrix(set('dont'), 2, 1, 0))
+    with pytest.raises(ValueError, match="'"):
+        checker.check("don't", 1)
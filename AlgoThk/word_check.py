@@ -0,0 +1,138 @@
+"""
+Spelling check against a dictionary of words
+
+The edit distance of two words is len(x) + len(y) minus their global
+alignment score, as in application #4. The dictionary is kept in a trie
+and one alignment row is computed per trie node, so words sharing a
+prefix share rows, and a branch is dropped as soon as every cell of its
+row is over the distance asked for.
+"""
+import string
+import alignment
+
+
+def edit_distance(seq_x, seq_y, scores):
+    """
+    Edit distance of two words, len(x) + len(y) - global alignment score
+
+    parameter
+    ---------
+    seq_x, seq_y: str, two words
+    scores: scoring matrix from build_scoring_matrix,
+        (2, 1, 0) counts substitutions, insertions and deletions
+    """
+    score = alignment.compute_alignment_score(seq_x, seq_y, scores, True)
+    return len(seq_x) + len(seq_y) - score
+
+
+class WordChecker:
+    """
+    Dictionary of words searched by edit distance
+
+    parameter
+    ---------
+    words: iterable of str, the dictionary
+    scores: scoring matrix from build_scoring_matrix, by default (2, 1, 0)
+        over the letters of the words and the ascii letters, where any
+        other letter of a checked word costs 1 against a letter or '-'
+
+    Every aligned pair of letters costs 2 - score and a letter against
+        '-' costs 1 - score, the costs of an alignment add up to its edit
+        distance. Costs have to be >= 0, so distances only grow along a
+        trie branch.
+    """
+
+    def __init__(self, words, scores=None):
+        """Build the trie of the words"""
+        words = set(words)
+        # (pair, gap) costs of letters outside the scoring matrix
+        self._unknown_costs = None
+        if scores is None:
+            alph = set(''.join(words)) | set(string.ascii_letters)
+            scores = alignment.build_scoring_matrix(alph, 2, 1, 0)
+            self._unknown_costs = (1, 1)
+        self.scores = scores
+
+        # letter costs, '-' included
+        self._costs = {}
+        for row_c, row in scores.items():
+            self._costs[row_c] = {}
+            for col_c, val in row.items():
+                self._costs[row_c][col_c] = (row_c != '-') + (col_c != '-') - val
+        if any(cost < 0 for row in self._costs.values() for cost in row.values()):
+            raise ValueError('scores give negative edit costs')
+
+        # trie node: [children by letter, word ending here or None]
+        self._root = [{}, None]
+        for word in words:
+            node = self._root
+            for char in word:
+                node = node[0].setdefault(char, [{}, None])
+            node[1] = word
+        self._size = len(words)
+
+    def __len__(self):
+        """Number of words"""
+        return self._size
+
+    def __contains__(self, word):
+        """Is the word in the dictionary"""
+        node = self._root
+        for char in word:
+            node = node[0].get(char)
+            if node is None:
+                return False
+        return node[1] is not None
+
+    def check(self, word, dist):
+        """
+        All dictionary words within edit distance dist of a word
+
+        parameter
+        ---------
+        word: str, the word to check
+        dist: the largest edit distance
+
+        return
+        ------
+        dict of dictionary word -> edit distance
+
+        A letter of word outside the scoring matrix raises ValueError,
+            unless the default scores are used
+        """
+        costs = self._costs
+        unknown = sorted(set(word) - set(costs['-']))
+        if unknown and self._unknown_costs is None:
+            raise ValueError('letter %r is not in the scoring matrix' % unknown[0])
+        pair_cost, gap_cost = self._unknown_costs or (None, None)
+        gaps = [costs['-'].get(char, gap_cost) for char in word]
+        first = [0]
+        for gap in gaps:
+            first.append(first[-1] + gap)
+
+        res = {}
+        if self._root[1] is not None and first[-1] <= dist:
+            res[self._root[1]] = first[-1]
+
+        # one row per trie node, against the letters of word
+        pair_rows = {}
+        stack = [(self._root, first)]
+        while stack:
+            node, prev = stack.pop()
+            for char, child in node[0].items():
+                char_costs = costs[char]
+                pairs = pair_rows.get(char)
+                if pairs is None:
+                    pairs = pair_rows[char] = [char_costs.get(col_c, pair_cost) for col_c in word]
+                row = [prev[0] + char_costs['-']]
+                for col_j, gap in enumerate(gaps):
+                    row.append(min(
+                        prev[col_j+1] + char_costs['-'],  # top tile
+                        prev[col_j] + pairs[col_j],  # upper-left tile
+                        row[col_j] + gap,  # left tile
+                    ))
+                if child[1] is not None and row[-1] <= dist:
+                    res[child[1]] = row[-1]
+                if min(row) <= dist:
+                    stack.append((child, row))
+        return res